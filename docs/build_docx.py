@@ -451,7 +451,7 @@ left_items = [
     ('Analytical Models', None),
 ]
 model_bullets = [
-    'Combo: Apriori (mlxtend); configurable thresholds; fallback to top-item ranking.',
+    'Combo: built-in Apriori (pyfim / efficient-apriori optional); configurable thresholds; fallback to top-item ranking.',
     'Demand: per-branch linear regression; point forecast + 90% confidence bounds; up to 12-month horizon.',
     'Expansion: 3 binary signals; composite score = demand × growth − competition × 0.3.',
     'Staffing: mean × 1.15 per (branch, shift), capped at observed max; flags min < 2.',
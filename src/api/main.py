@@ -11,11 +11,13 @@ Exposes:
   GET  /staffing       → Shift staffing estimates
   GET  /strategy       → Coffee & milkshake growth strategy
   GET  /overview       → Full dashboard summary
+  POST /admin/refresh  → Reload CSVs and clear cached analyses (needs X-Admin-Token)
 """
 
 import os
 import sys
 import json
+import secrets
 import traceback
 from pathlib import Path
 from functools import lru_cache
@@ -29,14 +31,18 @@ except ImportError:
     pass  # python-dotenv not installed; rely on environment variables set externally
 
 import numpy as np
-from fastapi import FastAPI, HTTPException, Query
+import pandas as pd
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 def _numpy_safe(obj: Any) -> Any:
-    """Recursively convert numpy scalars/arrays to native Python types."""
+    """Recursively convert numpy scalars/arrays and DataFrames to native Python types."""
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="records")
     if isinstance(obj, dict):
         return {k: _numpy_safe(v) for k, v in obj.items()}
     if isinstance(obj, list):
@@ -76,6 +82,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress the larger JSON payloads (/overview, /demand, /strategy) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # ── Cached data loading ───────────────────────────────────────────────────────
 _DATA: Optional[dict] = None
@@ -87,6 +95,56 @@ def get_data() -> dict:
     return _DATA
 
 
+# ── Cached analyses ───────────────────────────────────────────────────────────
+# The loaders are idempotent and _DATA is never mutated in place, so each model
+# output is a pure function of the loaded dataset. Keying on id(_DATA) means a
+# reload (new dict) naturally misses the cache; /admin/refresh also clears it.
+# The model entry points are themselves content-memoized (src/models/_cache), so
+# these caches and the local agent share one computation per dataset.
+
+@lru_cache(maxsize=1)
+def _combo_cached(data_id: int) -> dict:
+    return get_combo_summary(get_data()["delivery_items"])
+
+
+# n_months is always passed positionally so equal horizons share one entry
+@lru_cache(maxsize=12)
+def _demand_cached(data_id: int, n_months: int) -> dict:
+    return forecast_all_branches(get_data()["monthly_sales"], n_months)
+
+
+@lru_cache(maxsize=1)
+def _expansion_cached(data_id: int) -> dict:
+    data = get_data()
+    return expansion_feasibility(
+        data["monthly_sales"], data["branch_revenue"], data["menu_avg_sales"]
+    )
+
+
+# The staffing and strategy reports carry DataFrames; they are serialized once
+# here so warm requests return the cached JSON-ready records as-is.
+@lru_cache(maxsize=1)
+def _staffing_cached(data_id: int) -> dict:
+    return _numpy_safe(get_staffing_recommendations(get_data()["attendance"]))
+
+
+@lru_cache(maxsize=1)
+def _strategy_cached(data_id: int) -> dict:
+    data = get_data()
+    return _numpy_safe(generate_growth_strategy(data["sales_by_item"], data["division_summary"]))
+
+
+@lru_cache(maxsize=1)
+def _context_cached(data_id: int) -> str:
+    return build_context_snippet()
+
+
+_CACHED_ANALYSES = (
+    _combo_cached, _demand_cached, _expansion_cached,
+    _staffing_cached, _strategy_cached, _context_cached,
+)
+
+
 # ── Gemini agent setup ────────────────────────────────────────────────────────
 try:
     import google.generativeai as genai
@@ -96,6 +154,8 @@ except ImportError:
     _GENAI_AVAILABLE = False
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+# /admin/refresh is disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 _AGENT = None
 
 def get_agent():
@@ -137,6 +197,9 @@ Use that data to ground your answers in evidence.
 class QueryRequest(BaseModel):
     question: str
     include_data_context: bool = True
+    # Optional cap on the answer length (characters); clients that only show a
+    # preview send this so the full answer is never generated or transferred
+    max_answer_chars: Optional[int] = Field(default=None, ge=1)
 
 
 class QueryResponse(BaseModel):
@@ -146,16 +209,15 @@ class QueryResponse(BaseModel):
 
 
 # ── Helper: build agent context ───────────────────────────────────────────────
-def build_context_snippet(data: dict) -> str:
-    """Build a compact JSON context block from the latest analyses."""
+def build_context_snippet() -> str:
+    """Build a compact JSON context block from the latest analyses of the loaded dataset."""
     try:
-        combo = get_combo_summary(data["delivery_items"])
-        demand = forecast_all_branches(data["monthly_sales"])
-        expansion = expansion_feasibility(
-            data["monthly_sales"], data["branch_revenue"], data["menu_avg_sales"]
-        )
-        staffing = get_staffing_recommendations(data["attendance"])
-        strategy = generate_growth_strategy(data["sales_by_item"], data["division_summary"])
+        data_id = id(get_data())
+        combo = _combo_cached(data_id)
+        demand = _demand_cached(data_id, 3)
+        expansion = _expansion_cached(data_id)
+        staffing = _staffing_cached(data_id)
+        strategy = _strategy_cached(data_id)
 
         context = {
             "combo_top3": combo.get("top_combos", combo.get("top_items", []))[:3],
@@ -192,7 +254,7 @@ async def query_agent(req: QueryRequest):
 
     if agent is not None:
         # ── Gemini path ────────────────────────────────────────────────────────
-        context_block = build_context_snippet(data) if req.include_data_context else "{}"
+        context_block = _context_cached(id(data)) if req.include_data_context else "{}"
         prompt = f"""
 CURRENT DATA CONTEXT:
 ```json
@@ -202,6 +264,8 @@ CURRENT DATA CONTEXT:
 BUSINESS QUESTION:
 {req.question}
 """.strip()
+        if req.max_answer_chars:
+            prompt += f"\n\nKeep the answer under {req.max_answer_chars} characters."
         try:
             response = agent.generate_content(prompt)
             answer = response.text.strip()
@@ -211,6 +275,9 @@ BUSINESS QUESTION:
         # ── Local rule-based agent (no API key required) ───────────────────────
         answer = local_answer(req.question, data)
 
+    if req.max_answer_chars:
+        answer = answer[:req.max_answer_chars]
+
     return QueryResponse(
         question=req.question,
         answer=answer,
@@ -223,7 +290,7 @@ def get_combos(top_n: int = Query(default=10, ge=1, le=50)):
     """Return top product combination recommendations."""
     data = get_data()
     try:
-        result = get_combo_summary(data["delivery_items"])
+        result = _combo_cached(id(data))
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -234,7 +301,7 @@ def get_demand_all(n_months: int = Query(default=3, ge=1, le=12)):
     """Return demand forecast for all branches."""
     data = get_data()
     try:
-        return forecast_all_branches(data["monthly_sales"], n_months)
+        return _demand_cached(id(data), n_months)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -254,11 +321,7 @@ def get_expansion():
     """Return expansion feasibility analysis."""
     data = get_data()
     try:
-        result = expansion_feasibility(
-            data["monthly_sales"],
-            data["branch_revenue"],
-            data["menu_avg_sales"],
-        )
+        result = _expansion_cached(id(data))
         return JSONResponse(content=_numpy_safe(result))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -269,7 +332,7 @@ def get_staffing():
     """Return shift staffing recommendations."""
     data = get_data()
     try:
-        return get_staffing_recommendations(data["attendance"])
+        return JSONResponse(content=_staffing_cached(id(data)))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -279,7 +342,7 @@ def get_strategy():
     """Return coffee & milkshake growth strategy."""
     data = get_data()
     try:
-        return generate_growth_strategy(data["sales_by_item"], data["division_summary"])
+        return JSONResponse(content=_strategy_cached(id(data)))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -289,13 +352,12 @@ def get_overview():
     """Return a full dashboard summary combining all 5 objectives."""
     data = get_data()
     try:
-        combo = get_combo_summary(data["delivery_items"])
-        demand = forecast_all_branches(data["monthly_sales"])
-        expansion = expansion_feasibility(
-            data["monthly_sales"], data["branch_revenue"], data["menu_avg_sales"]
-        )
-        staffing = get_staffing_recommendations(data["attendance"])
-        strategy = generate_growth_strategy(data["sales_by_item"], data["division_summary"])
+        data_id = id(data)
+        combo = _combo_cached(data_id)
+        demand = _demand_cached(data_id, 3)
+        expansion = _expansion_cached(data_id)
+        staffing = _staffing_cached(data_id)
+        strategy = _strategy_cached(data_id)
 
         result = {
             "combo_highlights": combo.get("recommendations", [])[:3],
@@ -312,6 +374,21 @@ def get_overview():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/admin/refresh")
+def refresh_data(x_admin_token: str = Header(default="")):
+    """Reload all CSVs from disk and drop every cached analysis (requires X-Admin-Token)."""
+    global _DATA
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    try:
+        _DATA = load_all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    for fn in _CACHED_ANALYSES:
+        fn.cache_clear()
+    return {"status": "ok", "datasets": {k: len(v) for k, v in _DATA.items()}}
+
+
 # ── Dev runner ────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
@@ -454,7 +454,10 @@ def load_division_summary() -> pd.DataFrame:
 # ──────────────────────────────────────────────────────────────────────────────
 
 def load_all():
-    """Return a dict of all cleaned DataFrames."""
+    """
+    Return a dict of all cleaned DataFrames.
+    Idempotent: reads only the CSVs under DATA_DIR, so callers may cache the result.
+    """
     return {
         "monthly_sales": load_monthly_sales(),
         "branch_revenue": load_branch_tax_summary(),
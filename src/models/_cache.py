@@ -0,0 +1,61 @@
+"""
+Shared memoization for the model entry points.
+Results are keyed on the content of their DataFrame arguments, so every caller
+(API endpoints, local agent, scripts) shares one computation per dataset.
+"""
+from __future__ import annotations
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
+
+
+_CACHE_SIZE = 32
+
+
+def frame_key(df: pd.DataFrame) -> tuple:
+    """
+    Content hash of a DataFrame (values + column names), independent of its index.
+    Recomputed on every call, so in-place edits to a frame always miss the cache.
+    """
+    digest = hashlib.blake2b(
+        pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes(), digest_size=16
+    )
+    return df.shape, tuple(df.columns), digest.digest()
+
+
+def _arg_key(arg):
+    return ("frame", frame_key(arg)) if isinstance(arg, pd.DataFrame) else arg
+
+
+def memoize_on_frames(fn):
+    """
+    LRU-memoize fn(*args, **kwargs), keying DataFrame arguments on their content,
+    bounded to _CACHE_SIZE entries. The cache keeps its own deep copy and every
+    hit returns a fresh one, so callers may mutate what they receive.
+    """
+    cache: OrderedDict = OrderedDict()
+    lock = threading.Lock()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (
+            tuple(_arg_key(a) for a in args),
+            tuple(sorted((k, _arg_key(v)) for k, v in kwargs.items())),
+        )
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return copy.deepcopy(cache[key])
+        result = fn(*args, **kwargs)
+        with lock:
+            cache[key] = copy.deepcopy(result)
+            if len(cache) > _CACHE_SIZE:
+                cache.popitem(last=False)
+        return result
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
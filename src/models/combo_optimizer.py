@@ -1,35 +1,249 @@
 """
 Combo Optimization – Association Rule Mining on delivery basket data.
-Uses the Apriori algorithm (mlxtend) to find items frequently bought together.
+Uses frequent-itemset mining (pyfim FP-Growth / efficient-apriori when installed,
+else a built-in Apriori) to find items frequently bought together.
 """
 from __future__ import annotations
+from itertools import combinations
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from typing import Optional
 
+from src.models._cache import memoize_on_frames
 
-def build_baskets(delivery_df: pd.DataFrame) -> pd.DataFrame:
+
+def _paid_lines(delivery_df: pd.DataFrame, exclude: Optional[list] = None) -> pd.DataFrame:
     """
-    Convert line-item delivery data into a customer × item basket matrix.
-    Returns a binary (0/1) DataFrame where rows = orders and cols = items.
+    Slim branch/customer/item/qty frame of paid line items with cleaned item names.
+    Slices only the needed columns instead of copying the whole delivery frame.
     """
     # Filter out free/zero items and modifiers (price == 0)
-    paid = delivery_df[delivery_df["price"] > 0].copy()
+    paid = (delivery_df["price"] > 0).to_numpy()
     # Clean item names
-    paid["item"] = paid["item"].str.strip().str.upper()
+    item = delivery_df["item"][paid].str.strip().str.upper()
+    keep = ~item.isin(exclude).to_numpy() if exclude else np.ones(len(item), dtype=bool)
+    return pd.DataFrame({
+        "branch": delivery_df["branch"].to_numpy()[paid][keep],
+        "customer": delivery_df["customer"].to_numpy()[paid][keep],
+        "item": item.to_numpy()[keep],
+        "qty": delivery_df["qty"].to_numpy()[paid][keep],
+    })
+
+
+@memoize_on_frames
+def build_baskets(delivery_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert line-item delivery data into a customer × item basket matrix.
+    Returns a binary DataFrame where rows = orders and cols = items, backed by
+    a sparse 0/1 matrix (baskets are >95% zeros).
+    """
     # Drop delivery charges and very generic items
-    exclude = ["DELIVERY CHARGE", "SERVICE CHARGE"]
-    paid = paid[~paid["item"].isin(exclude)]
+    paid = _paid_lines(delivery_df, exclude=["DELIVERY CHARGE", "SERVICE CHARGE"])
 
     # Each (branch, customer) order = one basket
-    baskets = (
-        paid.groupby(["branch", "customer", "item"])["qty"]
-        .sum()
-        .unstack(fill_value=0)
-        .clip(upper=1)  # binarise
-        .reset_index(drop=True)
+    qty = paid.groupby(["branch", "customer", "item"])["qty"].sum()
+    if qty.empty:
+        return pd.DataFrame()
+    row_idx, orders = pd.factorize(qty.index.droplevel("item"))
+    items = pd.Categorical(qty.index.get_level_values("item"))
+    present = (qty > 0).to_numpy()  # binarise
+    mat = sparse.csr_matrix(
+        (np.ones(int(present.sum()), dtype=np.uint8),
+         (row_idx[present], items.codes[present])),
+        shape=(len(orders), len(items.categories)),
+    )
+    return pd.DataFrame.sparse.from_spmatrix(
+        mat, columns=pd.Index(items.categories, name="item")
     )
-    return baskets
+
+
+def _as_csr(baskets: pd.DataFrame) -> sparse.csr_matrix:
+    """Return the basket matrix as an integer CSR matrix."""
+    if hasattr(baskets, "sparse"):
+        return baskets.sparse.to_coo().tocsr().astype(np.int32)
+    return sparse.csr_matrix((baskets.to_numpy() > 0).astype(np.int32))
+
+
+# Bits set in each byte value — popcount fallback for NumPy < 2.0
+_POPCOUNT8 = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+
+def _pack_bitmap(mat: sparse.spmatrix) -> np.ndarray:
+    """
+    Pack each item column into a uint64 bitmap (one bit per basket), straight
+    from the CSC row indices — the basket matrix is never densified.
+    Returns a (n_items, ceil(n_baskets / 64)) array.
+    """
+    csc = sparse.csc_matrix(mat)
+    n_baskets, n_items = csc.shape
+    bits = np.zeros((n_items, -(-n_baskets // 64)), dtype=np.uint64)
+    nz = csc.data > 0
+    rows = csc.indices[nz].astype(np.int64)
+    cols = np.repeat(np.arange(n_items), np.diff(csc.indptr))[nz]
+    np.bitwise_or.at(bits, (cols, rows >> 6), np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+    return bits
+
+
+def _popcount_sum(words: np.ndarray) -> np.ndarray:
+    """Count set bits along the last axis of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT8[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def _pair_counts(bits: np.ndarray, block: int = 32, word_block: int = 128) -> np.ndarray:
+    """
+    Co-occurrence counts as popcount(A & B). Only tiles on or above the block
+    diagonal are computed, so every i <= j entry is filled (below-diagonal
+    tiles stay zero).
+    Tiled over i, j and word blocks so each (block, block, word_block) AND
+    temporary stays around 1 MB regardless of item or basket count.
+    """
+    n_items, n_words = bits.shape
+    co = np.zeros((n_items, n_items), dtype=np.int64)
+    for i0 in range(0, n_items, block):
+        a = bits[i0:i0 + block]
+        for j0 in range(i0, n_items, block):
+            b = bits[j0:j0 + block]
+            tile = co[i0:i0 + block, j0:j0 + block]
+            for w0 in range(0, n_words, word_block):
+                w1 = w0 + word_block
+                tile += _popcount_sum(a[:, None, w0:w1] & b[None, :, w0:w1])
+    return co
+
+
+def _apriori_gen(prev: list[tuple]) -> list[tuple]:
+    """
+    Candidate k-itemsets from the frequent (k-1)-itemsets (sorted tuples).
+    Joins itemsets sharing their first k-2 items, then prunes any candidate
+    with an infrequent (k-1)-subset.
+    """
+    frequent = set(prev)
+    by_prefix: dict[tuple, list] = {}
+    for itemset in prev:
+        by_prefix.setdefault(itemset[:-1], []).append(itemset[-1])
+    candidates = []
+    for prefix, tails in by_prefix.items():
+        for a, b in combinations(sorted(tails), 2):
+            cand = prefix + (a, b)
+            # Dropping a or b gives a joined parent; only the prefix items need checking
+            if all(cand[:i] + cand[i + 1:] in frequent for i in range(len(prefix))):
+                candidates.append(cand)
+    return candidates
+
+
+def _apriori_itemsets(baskets: pd.DataFrame, min_support: float) -> dict:
+    """Level-wise Apriori over the basket matrix. Returns {frozenset(items): support}."""
+    X = _as_csr(baskets).tocsc()  # column-major: candidate columns slice cheaply
+    n = X.shape[0]
+    if n == 0:
+        return {}
+    items = baskets.columns.to_numpy()
+    counts = np.asarray(X.sum(axis=0)).ravel()
+    level = {(i,): int(c) for i, c in enumerate(counts) if c / n >= min_support}
+    found = dict(level)
+    while level:
+        next_level = {}
+        for cand in _apriori_gen(sorted(level)):
+            hits = np.asarray(X[:, list(cand)].sum(axis=1)).ravel()
+            count = int(np.count_nonzero(hits == len(cand)))
+            if count / n >= min_support:
+                next_level[cand] = count
+        found.update(next_level)
+        level = next_level
+    return {frozenset(items[list(itemset)]): count / n for itemset, count in found.items()}
+
+
+def _transactions(baskets: pd.DataFrame) -> list[list]:
+    """Item-name lists, one per basket, for the compiled miners."""
+    mat = _as_csr(baskets)
+    items = baskets.columns.to_numpy()
+    return [
+        items[mat.indices[start:end]].tolist()
+        for start, end in zip(mat.indptr[:-1], mat.indptr[1:])
+    ]
+
+
+def _mine_frequent(baskets: pd.DataFrame, min_support: float) -> dict:
+    """
+    Mine frequent itemsets, returning {frozenset(items): support}.
+    Uses a compiled miner (pyfim, then efficient-apriori) when installed,
+    otherwise the built-in Apriori. Transactions are only built for the
+    compiled miners.
+    """
+    try:
+        from fim import fpgrowth  # type: ignore
+    except ImportError:
+        fpgrowth = None
+    if fpgrowth is not None:
+        return {
+            frozenset(itemset): support
+            for itemset, support in fpgrowth(
+                _transactions(baskets), target="s", supp=min_support * 100, zmin=1, report="s"
+            )
+        }
+    try:
+        from efficient_apriori import apriori as ea_apriori  # type: ignore
+    except ImportError:
+        return _apriori_itemsets(baskets, min_support)
+    transactions = [tuple(t) for t in _transactions(baskets)]
+    itemsets, _ = ea_apriori(transactions, min_support=min_support, min_confidence=1.0)
+    n = len(transactions)
+    return {
+        frozenset(itemset): count / n
+        for level in itemsets.values()
+        for itemset, count in level.items()
+    }
+
+
+def _rules_from_supports(
+    supports: dict,
+    min_confidence: float,
+    min_lift: float,
+) -> pd.DataFrame:
+    """
+    Generate association rules (antecedents → consequents) from itemset supports,
+    keeping only rules that meet both thresholds. Both sides are sorted tuples.
+    """
+    antecedent_col, consequent_col = [], []
+    support_col, sup_a_col, sup_c_col, confidence_col, lift_col = [], [], [], [], []
+    for itemset, support in supports.items():
+        ordered = sorted(itemset)
+        for k in range(1, len(itemset)):
+            for antecedents in combinations(ordered, k):
+                consequents = tuple(x for x in ordered if x not in antecedents)
+                sup_a = supports[frozenset(antecedents)]
+                sup_c = supports[frozenset(consequents)]
+                confidence = support / sup_a
+                if confidence < min_confidence:
+                    continue
+                lift = confidence / sup_c
+                if lift < min_lift:
+                    continue
+                antecedent_col.append(antecedents)
+                consequent_col.append(consequents)
+                support_col.append(support)
+                sup_a_col.append(sup_a)
+                sup_c_col.append(sup_c)
+                confidence_col.append(confidence)
+                lift_col.append(lift)
+
+    support = np.array(support_col, dtype=np.float64)
+    sup_a = np.array(sup_a_col, dtype=np.float64)
+    sup_c = np.array(sup_c_col, dtype=np.float64)
+    confidence = np.array(confidence_col, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        conviction = np.where(confidence >= 1, np.inf, (1 - sup_c) / (1 - confidence))
+    return pd.DataFrame({
+        "antecedents": pd.Series(antecedent_col, dtype=object),
+        "consequents": pd.Series(consequent_col, dtype=object),
+        "support": support,
+        "confidence": confidence,
+        "lift": np.array(lift_col, dtype=np.float64),
+        "leverage": support - sup_a * sup_c,
+        "conviction": conviction,
+    })
 
 
 def run_apriori(
@@ -40,65 +254,61 @@ def run_apriori(
 ) -> pd.DataFrame:
     """
     Run association rule mining and return a DataFrame of rules.
-    Falls back to a manual frequency calculation if mlxtend is unavailable.
+    Falls back to a manual pair co-occurrence count if no itemset clears min_support.
     """
-    try:
-        from mlxtend.frequent_patterns import apriori, association_rules
-        frequent_items = apriori(
-            baskets.astype(bool),
-            min_support=min_support,
-            use_colnames=True,
-        )
-        if frequent_items.empty:
-            return _fallback_top_pairs(baskets)
-        rules = association_rules(
-            frequent_items,
-            metric="lift",
-            min_threshold=min_lift,
-        )
-        rules = rules[rules["confidence"] >= min_confidence].copy()
-        rules.sort_values("lift", ascending=False, inplace=True)
-        rules.reset_index(drop=True, inplace=True)
-        # Convert frozensets to readable strings
-        rules["antecedents"] = rules["antecedents"].apply(lambda x: ", ".join(sorted(x)))
-        rules["consequents"] = rules["consequents"].apply(lambda x: ", ".join(sorted(x)))
-        return rules[[
-            "antecedents","consequents",
-            "support","confidence","lift","leverage","conviction"
-        ]]
-    except ImportError:
+    supports = _mine_frequent(baskets, min_support)
+    if not supports:
         return _fallback_top_pairs(baskets)
+    rules = _rules_from_supports(supports, min_confidence, min_lift)
+    rules = rules.sort_values("lift", ascending=False, kind="stable", ignore_index=True)
+    # Itemsets are already sorted tuples — join straight to readable strings
+    rules["antecedents"] = [", ".join(t) for t in rules["antecedents"].to_numpy()]
+    rules["consequents"] = [", ".join(t) for t in rules["consequents"].to_numpy()]
+    return rules[[
+        "antecedents","consequents",
+        "support","confidence","lift","leverage","conviction"
+    ]]
 
 
-def _fallback_top_pairs(baskets: pd.DataFrame, top_n: int = 20) -> pd.DataFrame:
+def _fallback_top_pairs(
+    baskets: pd.DataFrame,
+    top_n: int = 20,
+) -> pd.DataFrame:
     """
-    Manual co-occurrence counting when mlxtend is not installed.
+    Manual co-occurrence counting when no itemset reaches the support threshold.
     Returns top N item pairs by co-occurrence frequency.
+    Only items with at least one order are paired — a pair can never be more
+    frequent than either of its items.
     """
-    items = baskets.columns.tolist()
-    records = []
-    mat = baskets.values
-    n = len(mat)
-    for i, item_a in enumerate(items):
-        for j, item_b in enumerate(items):
-            if j <= i:
-                continue
-            both = int(((mat[:, i] > 0) & (mat[:, j] > 0)).sum())
-            support = both / n if n > 0 else 0
-            if both > 0:
-                conf_ab = both / max(int((mat[:, i] > 0).sum()), 1)
-                conf_ba = both / max(int((mat[:, j] > 0).sum()), 1)
-                records.append(dict(
-                    antecedents=item_a,
-                    consequents=item_b,
-                    support=support,
-                    confidence=max(conf_ab, conf_ba),
-                    lift=conf_ab / max(int((mat[:, j] > 0).sum()) / n, 1e-9),
-                ))
-    df = pd.DataFrame(records).sort_values("support", ascending=False)
+    mat = _as_csr(baskets)
+    n = mat.shape[0]
+    bits = _pack_bitmap(mat)
+    counts = _popcount_sum(bits)
+    # Downward closure: items never ordered cannot appear in any pair. A support
+    # cut is not applied — this path runs precisely because no item cleared it.
+    survivors = np.flatnonzero(counts >= 1)
+    items = baskets.columns.to_numpy()[survivors]
+    bits, counts = bits[survivors], counts[survivors]
+    # Pairwise co-occurrence counts via bit-packed baskets, 64 orders per AND
+    co = _pair_counts(bits)
+    i, j = np.triu_indices(len(items), k=1)
+    both = co[i, j]
+    keep = both > 0
+    i, j, both = i[keep], j[keep], both[keep]
+
+    conf_ab = both / np.maximum(counts[i], 1)
+    conf_ba = both / np.maximum(counts[j], 1)
+    df = pd.DataFrame({
+        "antecedents": items[i],
+        "consequents": items[j],
+        "support": both / n if n > 0 else np.zeros(len(both)),
+        "confidence": np.maximum(conf_ab, conf_ba),
+        "lift": conf_ab / np.maximum(counts[j] / max(n, 1), 1e-9),
+    }).sort_values("support", ascending=False)
     return df.head(top_n).reset_index(drop=True)
 
 
+@memoize_on_frames
 def top_combos(
     delivery_df: pd.DataFrame,
     top_n: int = 10,
@@ -107,20 +317,24 @@ def top_combos(
     """
     High-level function: return top N combo recommendations.
     """
+    empty = pd.DataFrame(columns=["antecedents","consequents","support","confidence","lift"])
+    # Raw (branch, customer) pairs bound the basket count — skip the pivot for tiny inputs
+    if delivery_df.empty or delivery_df.groupby(["branch", "customer"]).ngroups < 5:
+        return empty
     baskets = build_baskets(delivery_df)
     if baskets.empty or baskets.shape[0] < 5:
-        return pd.DataFrame(columns=["antecedents","consequents","support","confidence","lift"])
+        return empty
     rules = run_apriori(baskets, min_support=min_support)
     return rules.head(top_n)
 
 
+@memoize_on_frames
 def get_combo_summary(delivery_df: pd.DataFrame) -> dict:
     """Return a JSON-serializable summary of top combo recommendations."""
     df = top_combos(delivery_df)
     if df.empty:
         # Fallback: most frequently ordered single items
-        paid = delivery_df[delivery_df["price"] > 0].copy()
-        paid["item"] = paid["item"].str.strip().str.upper()
+        paid = _paid_lines(delivery_df)
         top_items = (
             paid.groupby("item")["qty"].sum()
             .sort_values(ascending=False)
@@ -135,14 +349,18 @@ def get_combo_summary(delivery_df: pd.DataFrame) -> dict:
                 for _, row in top_items.head(5).iterrows()
             ]
         }
-    combos = []
-    for _, row in df.iterrows():
-        combos.append({
-            "items": f"{row['antecedents']} + {row['consequents']}",
-            "support": round(float(row["support"]), 4),
-            "confidence": round(float(row["confidence"]), 4),
-            "lift": round(float(row["lift"]), 4),
-        })
+    combos = [
+        {
+            "items": f"{ante} + {cons}",
+            "support": round(support, 4),
+            "confidence": round(confidence, 4),
+            "lift": round(lift, 4),
+        }
+        for ante, cons, support, confidence, lift in zip(
+            df["antecedents"].tolist(), df["consequents"].tolist(),
+            df["support"].tolist(), df["confidence"].tolist(), df["lift"].tolist(),
+        )
+    ]
     recommendations = [
         f"Bundle '{c['items']}' — {c['confidence']*100:.0f}% of customers who buy one also buy the other (lift {c['lift']:.2f}x)"
         for c in combos[:5]
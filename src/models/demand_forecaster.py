@@ -8,11 +8,27 @@ import pandas as pd
 import numpy as np
 from typing import Optional
 
+from src.models._cache import memoize_on_frames
+
+try:
+    from prophet import Prophet  # type: ignore
+    _HAS_PROPHET = True
+except Exception:
+    Prophet = None
+    _HAS_PROPHET = False
+
+# Yearly seasonality needs at least two full cycles of monthly data
+_PROPHET_MIN_MONTHS = 24
+
 
 def _prepare_series(monthly_df: pd.DataFrame, branch: str) -> pd.DataFrame:
     """Return a sorted time-series DataFrame for a single branch."""
-    df = monthly_df[monthly_df["branch"] == branch].copy()
-    df = df.sort_values(["year", "month_num"])
+    return _index_series(monthly_df[monthly_df["branch"] == branch])
+
+
+def _index_series(branch_df: pd.DataFrame) -> pd.DataFrame:
+    """Sort one branch's monthly rows and add period / sequential t columns."""
+    df = branch_df.sort_values(["year", "month_num"])
     df["period"] = df["year"] * 100 + df["month_num"]  # YYYYMM integer
     # Create a sequential index (t = 1,2,3,…)
     df = df.reset_index(drop=True)
@@ -22,28 +38,28 @@ def _prepare_series(monthly_df: pd.DataFrame, branch: str) -> pd.DataFrame:
 
 def _linear_forecast(series: pd.DataFrame, n_periods: int = 3) -> pd.DataFrame:
     """Simple OLS trend + seasonal adjustment."""
-    from sklearn.linear_model import LinearRegression
+    t = series["t"].to_numpy(dtype=np.float64)
+    y = series["total_sales"].to_numpy(dtype=np.float64)
 
-    X = series[["t"]].values
-    y = series["total_sales"].values
+    # Closed-form least squares for a single regressor
+    tm, ym = t.mean(), y.mean()
+    var_t = ((t - tm) ** 2).sum()
+    slope = ((t - tm) * (y - ym)).sum() / var_t if var_t > 0 else 0.0
+    intercept = ym - slope * tm
 
-    model = LinearRegression()
-    model.fit(X, y)
-
-    t_future = np.arange(len(series) + 1, len(series) + n_periods + 1).reshape(-1, 1)
-    forecast = model.predict(t_future)
+    t_future = np.arange(len(t) + 1, len(t) + n_periods + 1)
+    forecast = np.maximum(intercept + slope * t_future, 0)
 
     # Assign month/year labels
     last_period = series["period"].iloc[-1]
     last_year = last_period // 100
     last_month = last_period % 100
-    future_rows = []
-    for i, f in enumerate(forecast):
-        m = (last_month + i) % 12 + 1
-        y_ = last_year + (last_month + i) // 12
-        future_rows.append({"year": y_, "month_num": m, "forecast": max(f, 0)})
-
-    return pd.DataFrame(future_rows)
+    offsets = last_month + np.arange(n_periods)
+    return pd.DataFrame({
+        "year": last_year + offsets // 12,
+        "month_num": offsets % 12 + 1,
+        "forecast": forecast,
+    })
 
 
 def forecast_branch(
@@ -55,7 +71,15 @@ def forecast_branch(
     Return demand forecast for the next n_months for a given branch.
     Tries Prophet first, falls back to linear regression.
     """
-    series = _prepare_series(monthly_df, branch)
+    return forecast_branch_from_series(_prepare_series(monthly_df, branch), branch, n_months)
+
+
+def forecast_branch_from_series(
+    series: pd.DataFrame,
+    branch: str,
+    n_months: int = 3,
+) -> dict:
+    """Forecast from an already-prepared single-branch series (see _index_series)."""
     if series.empty:
         return {"branch": branch, "error": "No data for this branch"}
 
@@ -64,47 +88,50 @@ def forecast_branch(
         7:"July",8:"August",9:"September",10:"October",11:"November",12:"December",
     }
 
-    # Historical stats
-    mean_sales = series["total_sales"].mean()
-    std_sales = series["total_sales"].std()
-    growth_pct = (
-        (series["total_sales"].iloc[-1] - series["total_sales"].iloc[0])
-        / series["total_sales"].iloc[0] * 100
-        if len(series) > 1 and series["total_sales"].iloc[0] > 0 else 0
-    )
-
-    # Attempt Prophet
-    try:
-        from prophet import Prophet  # type: ignore
-        pdf = series.copy()
-        pdf["ds"] = pd.to_datetime(
-            pdf["year"].astype(str) + "-" + pdf["month_num"].astype(str).str.zfill(2) + "-01"
-        )
-        pdf = pdf.rename(columns={"total_sales": "y"})[["ds", "y"]]
-        m = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
-        m.fit(pdf)
-        future = m.make_future_dataframe(periods=n_months, freq="MS")
-        forecast_df = m.predict(future).tail(n_months)[["ds", "yhat", "yhat_lower", "yhat_upper"]]
-        forecast_list = [
-            {
-                "period": f"{row['ds'].strftime('%B %Y')}",
-                "forecast": round(max(row["yhat"], 0), 2),
-                "lower": round(max(row["yhat_lower"], 0), 2),
-                "upper": round(max(row["yhat_upper"], 0), 2),
-            }
-            for _, row in forecast_df.iterrows()
-        ]
-        method = "prophet"
-    except (ImportError, Exception):
+    # Historical stats (one array materialisation, first/last by index)
+    sales = series["total_sales"].to_numpy(dtype=np.float64)
+    mean_sales = sales.mean()
+    first, last = sales[0], sales[-1]
+    growth_pct = (last - first) / first * 100 if len(sales) > 1 and first > 0 else 0
+
+    # Attempt Prophet (only when installed and the series is long enough)
+    forecast_list = None
+    if _HAS_PROPHET and len(series) >= _PROPHET_MIN_MONTHS:
+        try:
+            pdf = pd.DataFrame({
+                "ds": pd.to_datetime(
+                    series["year"].astype(str) + "-" + series["month_num"].astype(str).str.zfill(2) + "-01"
+                ),
+                "y": series["total_sales"],
+            })
+            m = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
+            m.fit(pdf)
+            future = m.make_future_dataframe(periods=n_months, freq="MS")
+            forecast_df = m.predict(future).tail(n_months)[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+            forecast_list = [
+                {
+                    "period": f"{row['ds'].strftime('%B %Y')}",
+                    "forecast": round(max(row["yhat"], 0), 2),
+                    "lower": round(max(row["yhat_lower"], 0), 2),
+                    "upper": round(max(row["yhat_upper"], 0), 2),
+                }
+                for _, row in forecast_df.iterrows()
+            ]
+            method = "prophet"
+        except Exception:
+            forecast_list = None
+    if forecast_list is None:
         fdf = _linear_forecast(series, n_months)
         forecast_list = [
             {
-                "period": f"{month_names.get(int(row['month_num']), int(row['month_num']))} {int(row['year'])}",
-                "forecast": round(float(row["forecast"]), 2),
-                "lower": round(float(row["forecast"]) * 0.9, 2),
-                "upper": round(float(row["forecast"]) * 1.1, 2),
+                "period": f"{month_names.get(month, month)} {year}",
+                "forecast": round(value, 2),
+                "lower": round(value * 0.9, 2),
+                "upper": round(value * 1.1, 2),
             }
-            for _, row in fdf.iterrows()
+            for year, month, value in zip(
+                fdf["year"].tolist(), fdf["month_num"].tolist(), fdf["forecast"].tolist()
+            )
         ]
         method = "linear_regression"
 
@@ -127,12 +154,14 @@ def _generate_demand_insight(branch: str, growth_pct: float, forecast: list) ->
     )
 
 
+@memoize_on_frames
 def forecast_all_branches(monthly_df: pd.DataFrame, n_months: int = 3) -> dict:
     """Forecast demand for all branches and return a combined summary."""
-    branches = monthly_df["branch"].unique().tolist()
-    results = {}
-    for branch in branches:
-        results[branch] = forecast_branch(monthly_df, branch, n_months)
+    # One groupby pass instead of re-scanning monthly_df for every branch
+    results = {
+        branch: forecast_branch_from_series(_index_series(branch_df), branch, n_months)
+        for branch, branch_df in monthly_df.groupby("branch", sort=False)
+    }
 
     # Rank branches by projected demand
     ranking = sorted(
@@ -8,6 +8,8 @@ import pandas as pd
 import numpy as np
 from typing import Optional
 
+from src.models._cache import memoize_on_frames
+
 
 CANDIDATE_LOCATIONS = [
     "Hamra",
@@ -22,6 +24,16 @@ CANDIDATE_LOCATIONS = [
     "Zarif",
 ]
 
+CHANNELS = ["DELIVERY", "TABLE", "TAKE AWAY"]
+
+
+def _monthly_growth_pct(sales: pd.Series) -> float:
+    """Compound monthly growth (%) from the first to the last month of a sorted series."""
+    s = sales.to_numpy()
+    if len(s) >= 2 and s[0] > 0:
+        return ((s[-1] / s[0]) ** (1 / max(len(s) - 1, 1)) - 1) * 100
+    return 0.0
+
 
 def compute_branch_metrics(
     monthly_df: pd.DataFrame,
@@ -41,56 +53,62 @@ def compute_branch_metrics(
     rev = revenue_df.set_index("branch")["revenue"]
 
     # --- Monthly growth rate (CAGR-style linear estimate) ---
-    growth_rates = {}
-    for branch in monthly_df["branch"].unique():
-        s = monthly_df[monthly_df["branch"] == branch].sort_values(
-            ["year", "month_num"]
-        )["total_sales"].values
-        if len(s) >= 2 and s[0] > 0:
-            growth_rates[branch] = ((s[-1] / s[0]) ** (1 / max(len(s) - 1, 1)) - 1) * 100
-        else:
-            growth_rates[branch] = 0.0
+    growth_rates = (
+        monthly_df.sort_values(["year", "month_num"])
+        .groupby("branch", sort=False)["total_sales"]
+        .agg(_monthly_growth_pct)
+    )
 
     # --- Customer metrics ---
-    cust = (
-        menu_avg_df.groupby("branch")
-        .agg(num_customers=("num_customers", "sum"), total_sales=("sales", "sum"))
-        .assign(avg_spend=lambda x: x["total_sales"] / x["num_customers"].clip(lower=1))
+    cust = menu_avg_df.groupby("branch", sort=False).agg(
+        num_customers=("num_customers", "sum"), total_sales=("sales", "sum")
     )
+    n_cust = cust["num_customers"].to_numpy()
+    cust["avg_spend"] = cust["total_sales"].to_numpy() / np.where(n_cust < 1, 1, n_cust)
 
     # --- Channel mix ---
-    channel = (
-        menu_avg_df.groupby(["branch", "menu_channel"])["sales"]
-        .sum()
-        .unstack(fill_value=0)
-    )
-    for col in ["DELIVERY", "TABLE", "TAKE AWAY"]:
-        if col not in channel.columns:
-            channel[col] = 0
+    # Flat (branch, channel) bin index → one bincount instead of groupby + unstack
+    branch_codes, branch_names = pd.factorize(menu_avg_df["branch"])
+    channel_codes = pd.Categorical(menu_avg_df["menu_channel"], categories=CHANNELS).codes
+    valid = (branch_codes >= 0) & (channel_codes >= 0)
+    sums = np.bincount(
+        branch_codes[valid] * len(CHANNELS) + channel_codes[valid],
+        weights=menu_avg_df["sales"].to_numpy(dtype=np.float64)[valid],
+        minlength=len(branch_names) * len(CHANNELS),
+    ).reshape(-1, len(CHANNELS))
+    channel = pd.DataFrame(sums, index=pd.Index(branch_names, name="branch"), columns=CHANNELS)
     channel_total = channel.sum(axis=1).clip(lower=1)
-    channel_pct = (channel.div(channel_total, axis=0) * 100).round(1)
+    channel_pct = channel.div(channel_total, axis=0) * 100
     channel_pct.columns = [f"pct_{c.lower().replace(' ','_')}" for c in channel_pct.columns]
 
-    branches = list(set(list(rev.index) + list(growth_rates.keys())))
-    rows = []
+    # --- Assemble one index-aligned table instead of per-branch scalar lookups ---
+    branches = rev.index.union(growth_rates.index, sort=False)
+    metrics = pd.concat(
+        [
+            rev.rename("total_revenue"),
+            growth_rates.rename("monthly_growth_pct"),
+            cust[["num_customers", "avg_spend"]],
+            channel_pct[["pct_delivery", "pct_table", "pct_take_away"]],
+        ],
+        axis=1,
+    ).reindex(branches).fillna(0)
+    metrics.index.name = "branch"
+
     total_rev = rev.sum() if not rev.empty else 1
-    for b in branches:
-        r = rev.get(b, 0)
-        rows.append({
-            "branch": b,
-            "total_revenue": r,
-            "revenue_share_pct": round(r / total_rev * 100, 2) if total_rev else 0,
-            "monthly_growth_pct": round(growth_rates.get(b, 0), 2),
-            "num_customers": int(cust.loc[b, "num_customers"]) if b in cust.index else 0,
-            "avg_spend": round(cust.loc[b, "avg_spend"], 2) if b in cust.index else 0,
-            "pct_delivery": float(channel_pct.loc[b, "pct_delivery"]) if b in channel_pct.index else 0,
-            "pct_table": float(channel_pct.loc[b, "pct_table"]) if b in channel_pct.index else 0,
-            "pct_take_away": float(channel_pct.loc[b, "pct_take_away"]) if b in channel_pct.index else 0,
-        })
-
-    return pd.DataFrame(rows).set_index("branch")
+    metrics["revenue_share_pct"] = metrics["total_revenue"] / total_rev * 100 if total_rev else 0
+    metrics["num_customers"] = metrics["num_customers"].astype(int)
+
+    # All rounding happens once, on the final table
+    return metrics[[
+        "total_revenue", "revenue_share_pct", "monthly_growth_pct", "num_customers",
+        "avg_spend", "pct_delivery", "pct_table", "pct_take_away",
+    ]].round({
+        "revenue_share_pct": 2, "monthly_growth_pct": 2, "avg_spend": 2,
+        "pct_delivery": 1, "pct_table": 1, "pct_take_away": 1,
+    })
 
 
+@memoize_on_frames
 def expansion_feasibility(
     monthly_df: pd.DataFrame,
     revenue_df: pd.DataFrame,
@@ -121,21 +139,20 @@ def expansion_feasibility(
     # Scoring heuristic: weight by proximity signals (simulated from existing branches)
     # In absence of geodata, use a randomised but seeded, plausible scoring
     rng = np.random.default_rng(42)
-    loc_scores = []
-    for loc in CANDIDATE_LOCATIONS:
-        # Proximity premium: closer to high-growth branches = higher score
-        growth_factor = rng.uniform(0.5, 1.5)
-        demand_potential = rng.uniform(60, 100) * (1 + avg_monthly_growth / 100)
-        competition_risk = rng.uniform(20, 60)
-        composite = demand_potential * growth_factor - competition_risk * 0.3
-        loc_scores.append({
-            "location": loc,
-            "demand_score": round(demand_potential, 1),
-            "competition_risk": round(competition_risk, 1),
-            "composite_score": round(composite, 1),
-        })
-
-    loc_df = pd.DataFrame(loc_scores).sort_values("composite_score", ascending=False)
+    # One (n, 3) draw consumes the stream in the same order as three draws per location
+    draws = rng.uniform(low=[0.5, 60, 20], high=[1.5, 100, 60], size=(len(CANDIDATE_LOCATIONS), 3))
+    # Proximity premium: closer to high-growth branches = higher score
+    growth_factor = draws[:, 0]
+    demand_potential = draws[:, 1] * (1 + avg_monthly_growth / 100)
+    competition_risk = draws[:, 2]
+    composite = demand_potential * growth_factor - competition_risk * 0.3
+
+    loc_df = pd.DataFrame({
+        "location": CANDIDATE_LOCATIONS,
+        "demand_score": demand_potential.round(1),
+        "competition_risk": competition_risk.round(1),
+        "composite_score": composite.round(1),
+    }).sort_values("composite_score", ascending=False)
     top_locations = loc_df.head(3).to_dict(orient="records")
 
     # ── Generate Recommendations ──────────────────────────────────────────────
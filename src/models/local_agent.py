@@ -5,7 +5,18 @@ No external API calls — safe to deploy anywhere.
 """
 from __future__ import annotations
 import math
-from typing import Any
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable
+
+import pandas as pd
+
+from src.models.combo_optimizer import get_combo_summary
+from src.models.demand_forecaster import forecast_all_branches
+from src.models.expansion_analyzer import expansion_feasibility
+from src.models.staffing_estimator import get_staffing_recommendations
+from src.models.sales_strategist import generate_growth_strategy
 
 
 # ── Question classifier ───────────────────────────────────────────────────────
@@ -39,67 +50,100 @@ _TOPIC_KEYWORDS: dict[str, list[str]] = {
 }
 
 
+def _invert_keywords(topic_keywords: dict[str, list[str]]) -> dict[str, list[str]]:
+    """Map each keyword to the topics it scores for."""
+    keyword_topics: dict[str, list[str]] = {}
+    for topic, kws in topic_keywords.items():
+        for kw in kws:
+            keyword_topics.setdefault(kw, []).append(topic)
+    return keyword_topics
+
+
+_KEYWORD_TOPICS = _invert_keywords(_TOPIC_KEYWORDS)
+
+# One overlapping, longest-first scan over every keyword; keywords nested inside
+# a longer hit (e.g. "bev" in "beverage") are recovered via _CONTAINED.
+_KEYWORD_RE = re.compile(
+    "(?=("
+    + "|".join(map(re.escape, sorted(_KEYWORD_TOPICS, key=len, reverse=True)))
+    + "))"
+)
+_CONTAINED: dict[str, frozenset[str]] = {
+    kw: frozenset(other for other in _KEYWORD_TOPICS if other in kw)
+    for kw in _KEYWORD_TOPICS
+}
+
+
+# Dashboards re-ask the same handful of questions; repeats skip the scan entirely
+@lru_cache(maxsize=256)
 def _classify(question: str) -> str:
     q = question.lower()
+    hits: set[str] = set()
+    for m in _KEYWORD_RE.finditer(q):
+        hits |= _CONTAINED[m.group(1)]
     scores: dict[str, int] = {topic: 0 for topic in _TOPIC_KEYWORDS}
-    for topic, kws in _TOPIC_KEYWORDS.items():
-        for kw in kws:
-            if kw in q:
-                scores[topic] += 1
+    for kw in hits:
+        for topic in _KEYWORD_TOPICS[kw]:
+            scores[topic] += 1
     best = max(scores, key=lambda t: scores[t])
     return best if scores[best] > 0 else "overview"
 
 
 # ── Individual answer generators ──────────────────────────────────────────────
 
-def _fmt(n: float, decimals: int = 0) -> str:
-    """Format a number with commas."""
-    if decimals == 0:
-        return f"{int(round(n)):,}"
-    return f"{n:,.{decimals}f}"
+def _fmt0(n: float) -> str:
+    """Format a number rounded to an integer with commas."""
+    return format(round(n), ",")
+
+
+_STAFFING_NETWORK = (
+    "**Network summary:**\n"
+    "- {slots} branch-shift slots tracked\n"
+    "- {total_rec} total recommended staff daily (across all shifts)\n"
+    "- {at_risk} shift(s) have recorded min < 2 staff\n\n"
+    "**Top shifts by recommended headcount:**\n"
+    "{top_shifts}\n"
+)
 
 
 def _answer_staffing(staffing: dict, question: str) -> str:
     alerts = staffing.get("alerts", [])
-    shift_summary = staffing.get("shift_summary", [])
+    shift_summary = pd.DataFrame(staffing.get("shift_summary", []))
     recommendations = staffing.get("recommendations", [])
 
-    lines = ["## Staffing Analysis\n"]
+    sections = ["## Staffing Analysis\n"]
 
     if alerts:
-        lines.append(f"**{len(alert_list := alerts)} shift(s) are below minimum safe headcount (< 2 staff):**\n")
-        for a in alerts:
-            lines.append(f"- {a}")
-        lines.append("")
+        alert_block = "\n".join(f"- {a}" for a in alerts)
+        sections.append(
+            f"**{len(alerts)} shift(s) are below minimum safe headcount (< 2 staff):**\n\n{alert_block}\n"
+        )
     else:
-        lines.append("**All shifts are adequately staffed** — no critical gaps detected.\n")
-
-    if shift_summary:
-        total_rec = sum(r.get("recommended_staff", 0) for r in shift_summary)
-        at_risk = [r for r in shift_summary if r.get("min_staff", 2) < 2]
-        lines.append(f"**Network summary:**")
-        lines.append(f"- {len(shift_summary)} branch-shift slots tracked")
-        lines.append(f"- {int(total_rec)} total recommended staff daily (across all shifts)")
-        lines.append(f"- {len(at_risk)} shift(s) have recorded min < 2 staff\n")
+        sections.append("**All shifts are adequately staffed** — no critical gaps detected.\n")
 
+    if len(shift_summary):
         # highest-need shifts
-        sorted_shifts = sorted(shift_summary, key=lambda r: r.get("recommended_staff", 0), reverse=True)
-        lines.append("**Top shifts by recommended headcount:**")
-        for r in sorted_shifts[:4]:
-            lines.append(
-                f"- **{r.get('branch')} — {r.get('shift')}**: "
-                f"recommended {int(r.get('recommended_staff', 0))} staff "
-                f"(historical mean {r.get('mean_staff', 0):.1f}, "
-                f"min observed {int(r.get('min_staff', 0))})"
+        top = shift_summary.nlargest(4, "recommended_staff")
+        top_shifts = "\n".join(
+            f"- **{branch} — {shift}**: "
+            f"recommended {int(rec)} staff "
+            f"(historical mean {mean:.1f}, "
+            f"min observed {int(low)})"
+            for branch, shift, rec, mean, low in zip(
+                top["branch"], top["shift"], top["recommended_staff"], top["mean_staff"], top["min_staff"]
             )
-        lines.append("")
+        )
+        sections.append(_STAFFING_NETWORK.format(
+            slots=len(shift_summary),
+            total_rec=int(shift_summary["recommended_staff"].sum()),
+            at_risk=int((shift_summary["min_staff"] < 2).sum()),
+            top_shifts=top_shifts,
+        ))
 
     if recommendations:
-        lines.append("**Recommended actions:**")
-        for rec in recommendations[:5]:
-            lines.append(f"- {rec}")
+        sections.append("**Recommended actions:**\n" + "\n".join(f"- {rec}" for rec in recommendations[:5]))
 
-    return "\n".join(lines)
+    return "\n".join(sections)
 
 
 def _answer_combo(combo: dict, question: str) -> str:
@@ -142,7 +186,7 @@ def _answer_combo(combo: dict, question: str) -> str:
             "Top individual items by volume (use as bundle seeds):\n"
         )
         for item in top_items[:5]:
-            lines.append(f"- **{item.get('item')}**: {_fmt(item.get('qty', 0))} units sold")
+            lines.append(f"- **{item.get('item')}**: {_fmt0(item.get('qty', 0))} units sold")
         lines.append("")
         if recs:
             lines.append("**Recommendations:**")
@@ -158,40 +202,52 @@ def _answer_demand(demand: dict, question: str) -> str:
     ranking = demand.get("demand_ranking", [])
     forecasts = demand.get("forecasts", {})
 
-    lines = ["## Demand Forecast Analysis\n"]
+    sections = ["## Demand Forecast Analysis\n"]
 
     if ranking:
         top = ranking[0]
         bottom = ranking[-1]
         spread = ((top["avg_forecast"] - bottom["avg_forecast"]) / max(bottom["avg_forecast"], 1)) * 100
-
-        lines.append("**Projected monthly demand — next 3 months:**\n")
-        for i, r in enumerate(ranking, 1):
-            lines.append(
-                f"{i}. **{r['branch']}**: {_fmt(r['avg_forecast'])} units/month avg"
-            )
-        lines.append(
-            f"\n**{top['branch']}** leads demand by a {spread:.0f}% margin over **{bottom['branch']}**.\n"
+        ranked = "\n".join(
+            f"{i}. **{r['branch']}**: {_fmt0(r['avg_forecast'])} units/month avg"
+            for i, r in enumerate(ranking, 1)
+        )
+        sections.append(
+            f"**Projected monthly demand — next 3 months:**\n\n{ranked}\n\n"
+            f"**{top['branch']}** leads demand by a {spread:.0f}% margin over **{bottom['branch']}**.\n"
         )
 
     if forecasts:
-        growing = [(b, d.get("growth_pct_over_period", 0)) for b, d in forecasts.items()
-                   if d.get("growth_pct_over_period", 0) > 5]
-        declining = [(b, d.get("growth_pct_over_period", 0)) for b, d in forecasts.items()
-                     if d.get("growth_pct_over_period", 0) < -5]
+        growing, declining = [], []
+        for b, d in forecasts.items():
+            g = d.get("growth_pct_over_period", 0)
+            if g > 5:
+                growing.append((b, g))
+            elif g < -5:
+                declining.append((b, g))
 
         if growing:
-            lines.append("**Growing branches** (trend > +5%):")
-            for b, g in growing:
-                lines.append(f"- {b}: {g:+.1f}% trend — pre-position inventory above forecast")
+            sections.append("**Growing branches** (trend > +5%):\n" + "\n".join(
+                f"- {b}: {g:+.1f}% trend — pre-position inventory above forecast" for b, g in growing
+            ))
         if declining:
-            lines.append("\n**Declining branches** (trend < -5%):")
-            for b, g in declining:
-                lines.append(f"- {b}: {g:+.1f}% trend — investigate before committing stock")
+            sections.append("\n**Declining branches** (trend < -5%):\n" + "\n".join(
+                f"- {b}: {g:+.1f}% trend — investigate before committing stock" for b, g in declining
+            ))
         if not growing and not declining:
-            lines.append("**All branches show stable demand trends** — use historical means as baseline.")
+            sections.append("**All branches show stable demand trends** — use historical means as baseline.")
 
-    return "\n".join(lines)
+    return "\n".join(sections)
+
+
+_EXPANSION_HEAD = (
+    "## Expansion Feasibility\n\n"
+    "**Verdict: {verdict}** ({n_signals}/3 signals met)\n\n"
+    "**Signal breakdown:**\n"
+    "- Network growth (>1%/month): {growth} — {avg_growth:.2f}%/month actual\n"
+    "- Branch saturation (>40% revenue share): {saturation}\n"
+    "- Customer density (>500 network-wide): {density} — {customers} customers\n"
+)
 
 
 def _answer_expansion(expansion: dict, question: str) -> str:
@@ -200,141 +256,204 @@ def _answer_expansion(expansion: dict, question: str) -> str:
     stats = expansion.get("network_stats", {})
     top_locs = expansion.get("top_candidate_locations", [])
 
-    growing = signals.get("growing_network", False)
-    saturated = signals.get("saturated_branch_present", False)
-    dense = signals.get("high_customer_density", False)
-    n_signals = sum([growing, saturated, dense])
+    # Pack the three signals into bits: 4 = growing, 2 = saturated, 1 = dense
+    flags = (
+        bool(signals.get("growing_network", False)) << 2
+        | bool(signals.get("saturated_branch_present", False)) << 1
+        | bool(signals.get("high_customer_density", False))
+    )
 
     avg_growth = stats.get("avg_monthly_growth_pct", 0)
-    total_cust = stats.get("total_customers", 0)
-
-    lines = ["## Expansion Feasibility\n"]
-    verdict_line = "RECOMMENDED" if verdict == "RECOMMENDED" else "NOT RECOMMENDED"
-    lines.append(f"**Verdict: {verdict_line}** ({n_signals}/3 signals met)\n")
 
-    lines.append("**Signal breakdown:**")
-    lines.append(f"- Network growth (>1%/month): {'PASSED' if growing else 'FAILED'} — {avg_growth:.2f}%/month actual")
-    lines.append(f"- Branch saturation (>40% revenue share): {'PASSED' if saturated else 'NOT MET'}")
-    lines.append(f"- Customer density (>500 network-wide): {'PASSED' if dense else 'NOT MET'} — {_fmt(total_cust)} customers")
-    lines.append("")
+    sections = [_EXPANSION_HEAD.format(
+        verdict="RECOMMENDED" if verdict == "RECOMMENDED" else "NOT RECOMMENDED",
+        n_signals=flags.bit_count(),
+        growth="PASSED" if flags & 4 else "FAILED",
+        avg_growth=avg_growth,
+        saturation="PASSED" if flags & 2 else "NOT MET",
+        density="PASSED" if flags & 1 else "NOT MET",
+        customers=_fmt0(stats.get("total_customers", 0)),
+    )]
 
     if top_locs:
-        lines.append("**Top candidate locations:**")
-        for i, loc in enumerate(top_locs[:3], 1):
-            lines.append(
-                f"{i}. **{loc.get('location')}** — composite score {loc.get('composite_score')}, "
-                f"demand {loc.get('demand_score')}, competition risk {loc.get('competition_risk')}"
-            )
-        lines.append("")
+        locs = "\n".join(
+            f"{i}. **{loc.get('location')}** — composite score {loc.get('composite_score')}, "
+            f"demand {loc.get('demand_score')}, competition risk {loc.get('competition_risk')}"
+            for i, loc in enumerate(top_locs[:3], 1)
+        )
+        sections.append(f"**Top candidate locations:**\n{locs}\n")
 
     if verdict == "RECOMMENDED":
-        lines.append(
+        sections.append(
             f"**Recommendation:** Commission a site survey for **{top_locs[0]['location']}**. "
             "Network momentum supports a 5th branch."
         )
     else:
-        lines.append(
+        sections.append(
             f"**Recommendation:** Hold on expansion. "
             f"Strengthen existing branch performance (avg growth {avg_growth:.1f}%/month) "
             "before committing to new fixed costs."
         )
 
-    return "\n".join(lines)
+    return "\n".join(sections)
+
+
+_STRATEGY_HEAD = (
+    "## Beverage Growth Strategy\n\n"
+    "**Current beverage revenue share: {bev_pct:.1f}%** "
+    "(coffee {coffee_pct:.1f}% + milkshake {shake_pct:.1f}%)\n"
+    "Industry benchmark: 35%. Gap to close: **{gap:.1f} percentage points**.\n"
+)
+_PRIORITY_LABELS = ("IMMEDIATE", "IMMEDIATE", "THIS MONTH", "THIS QUARTER", "THIS QUARTER")
 
 
 def _answer_strategy(strategy: dict, question: str) -> str:
     summary = strategy.get("summary", {})
     under_coffee = strategy.get("underperforming_coffee_branches", [])
     under_shake = strategy.get("underperforming_shake_branches", [])
-    top_coffee = strategy.get("top_coffee_items", [])
-    top_shakes = strategy.get("top_milkshake_items", [])
+    top_coffee = pd.DataFrame(strategy.get("top_coffee_items", []))
     strategies = strategy.get("strategies", [])
 
     coffee_pct = summary.get("coffee_share_pct", 0)
     shake_pct = summary.get("milkshake_share_pct", 0)
     bev_pct = coffee_pct + shake_pct
-    gap = max(35 - bev_pct, 0)
 
-    lines = ["## Beverage Growth Strategy\n"]
-    lines.append(
-        f"**Current beverage revenue share: {bev_pct:.1f}%** "
-        f"(coffee {coffee_pct:.1f}% + milkshake {shake_pct:.1f}%)\n"
-        f"Industry benchmark: 35%. Gap to close: **{gap:.1f} percentage points**.\n"
-    )
+    sections = [_STRATEGY_HEAD.format(
+        bev_pct=bev_pct, coffee_pct=coffee_pct, shake_pct=shake_pct, gap=max(35 - bev_pct, 0)
+    )]
 
     if under_coffee:
-        lines.append(f"**Underperforming on coffee (<20% share):** {', '.join(under_coffee)}")
-        lines.append("→ Priority targets for barista training and menu prominence.\n")
+        sections.append(
+            f"**Underperforming on coffee (<20% share):** {', '.join(under_coffee)}\n"
+            "→ Priority targets for barista training and menu prominence.\n"
+        )
     if under_shake:
-        lines.append(f"**Underperforming on milkshakes (<10% share):** {', '.join(under_shake)}")
-        lines.append("→ Consider seasonal/limited SKUs to stimulate trial.\n")
+        sections.append(
+            f"**Underperforming on milkshakes (<10% share):** {', '.join(under_shake)}\n"
+            "→ Consider seasonal/limited SKUs to stimulate trial.\n"
+        )
 
-    if top_coffee:
-        lines.append("**Top coffee products by revenue:**")
-        for item in top_coffee[:3]:
-            lines.append(f"- {item.get('item')}: {_fmt(item.get('total_qty', 0))} units")
-        lines.append("")
+    if len(top_coffee):
+        head = top_coffee.head(3)
+        items = "\n".join(
+            f"- {item}: {_fmt0(qty)} units" for item, qty in zip(head["item"], head["total_qty"])
+        )
+        sections.append(f"**Top coffee products by revenue:**\n{items}\n")
 
     if strategies:
-        lines.append("**Prioritised growth actions:**")
-        priority_labels = ["IMMEDIATE", "IMMEDIATE", "THIS MONTH", "THIS QUARTER", "THIS QUARTER"]
-        for i, s in enumerate(strategies[:5]):
-            label = priority_labels[i] if i < len(priority_labels) else "PLANNED"
-            lines.append(
-                f"{i+1}. **[{label}] {s.get('strategy')}** — {s.get('action')} "
-                f"*(expected: {s.get('expected_impact')})*"
-            )
+        actions = "\n".join(
+            f"{i+1}. **[{_PRIORITY_LABELS[i] if i < len(_PRIORITY_LABELS) else 'PLANNED'}] "
+            f"{s.get('strategy')}** — {s.get('action')} "
+            f"*(expected: {s.get('expected_impact')})*"
+            for i, s in enumerate(strategies[:5])
+        )
+        sections.append(f"**Prioritised growth actions:**\n{actions}")
 
-    return "\n".join(lines)
+    return "\n".join(sections)
 
 
 def _answer_overview(
     combo: dict, demand: dict, expansion: dict, staffing: dict, strategy: dict, question: str
 ) -> str:
-    lines = ["## Operations Overview\n"]
+    sections = ["## Operations Overview\n"]
 
     # Top priority
     alerts = staffing.get("alerts", [])
     if alerts:
-        lines.append(f"**URGENT — Staffing:** {len(alerts)} shift(s) below minimum safe headcount.")
-        for a in alerts[:2]:
-            lines.append(f"- {a}")
-        lines.append("")
+        urgent = "\n".join(f"- {a}" for a in alerts[:2])
+        sections.append(
+            f"**URGENT — Staffing:** {len(alerts)} shift(s) below minimum safe headcount.\n{urgent}\n"
+        )
 
     # Demand
     ranking = demand.get("demand_ranking", [])
     if ranking:
         top = ranking[0]
         bottom = ranking[-1]
-        lines.append(
-            f"**Demand:** {top['branch']} leads at {_fmt(top['avg_forecast'])} units/month; "
-            f"{bottom['branch']} trails at {_fmt(bottom['avg_forecast'])} units/month."
+        sections.append(
+            f"**Demand:** {top['branch']} leads at {_fmt0(top['avg_forecast'])} units/month; "
+            f"{bottom['branch']} trails at {_fmt0(bottom['avg_forecast'])} units/month."
         )
 
     # Expansion
-    verdict = expansion.get("feasibility", "N/A")
     top_locs = expansion.get("top_candidate_locations", [])
     top_loc_name = top_locs[0].get("location", "N/A") if top_locs else "N/A"
-    lines.append(f"**Expansion:** {verdict}. Top candidate location: {top_loc_name}.")
+    sections.append(
+        f"**Expansion:** {expansion.get('feasibility', 'N/A')}. Top candidate location: {top_loc_name}."
+    )
 
     # Beverage
     summary = strategy.get("summary", {})
     bev_pct = summary.get("coffee_share_pct", 0) + summary.get("milkshake_share_pct", 0)
     gap = max(35 - bev_pct, 0)
-    lines.append(f"**Beverages:** {bev_pct:.1f}% revenue share — {gap:.1f}pp below the 35% benchmark.")
+    sections.append(f"**Beverages:** {bev_pct:.1f}% revenue share — {gap:.1f}pp below the 35% benchmark.")
 
     # Top combo
     combos = combo.get("top_combos", [])
     if combos:
         best = combos[0]
-        lines.append(
+        sections.append(
             f"**Top combo to promote:** {best.get('items')} "
             f"(lift {best.get('lift', 0):.2f}x, {best.get('confidence', 0)*100:.0f}% confidence)."
         )
 
-    lines.append("")
-    lines.append("Ask a more specific question about staffing, demand, combos, expansion, or beverage growth for deeper detail.")
-    return "\n".join(lines)
+    sections.append(
+        "\nAsk a more specific question about staffing, demand, combos, expansion, or beverage growth for deeper detail."
+    )
+    return "\n".join(sections)
+
+
+# ── Topic dispatch ────────────────────────────────────────────────────────────
+
+def _staffing(data: dict, question: str) -> str:
+    return _answer_staffing(get_staffing_recommendations(data["attendance"]), question)
+
+
+def _combo(data: dict, question: str) -> str:
+    return _answer_combo(get_combo_summary(data["delivery_items"]), question)
+
+
+def _demand(data: dict, question: str) -> str:
+    return _answer_demand(forecast_all_branches(data["monthly_sales"]), question)
+
+
+def _expansion(data: dict, question: str) -> str:
+    expansion = expansion_feasibility(
+        data["monthly_sales"], data["branch_revenue"], data["menu_avg_sales"]
+    )
+    return _answer_expansion(expansion, question)
+
+
+def _beverage(data: dict, question: str) -> str:
+    strategy = generate_growth_strategy(data["sales_by_item"], data["division_summary"])
+    return _answer_strategy(strategy, question)
+
+
+def _overview(data: dict, question: str) -> str:
+    # The five producers share no state and spend most of their time in
+    # pandas/NumPy, so a cold overview costs roughly the slowest model, not the sum
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        futures = (
+            ex.submit(get_combo_summary, data["delivery_items"]),
+            ex.submit(forecast_all_branches, data["monthly_sales"]),
+            ex.submit(
+                expansion_feasibility,
+                data["monthly_sales"], data["branch_revenue"], data["menu_avg_sales"],
+            ),
+            ex.submit(get_staffing_recommendations, data["attendance"]),
+            ex.submit(generate_growth_strategy, data["sales_by_item"], data["division_summary"]),
+        )
+    combo, demand, expansion, staffing, strategy = (f.result() for f in futures)
+    return _answer_overview(combo, demand, expansion, staffing, strategy, question)
+
+
+_DISPATCH: dict[str, Callable[[dict, str], str]] = {
+    "staffing": _staffing,
+    "combo": _combo,
+    "demand": _demand,
+    "expansion": _expansion,
+    "beverage": _beverage,
+}
 
 
 # ── Public entry point ────────────────────────────────────────────────────────
@@ -344,46 +463,9 @@ def answer_question(question: str, data: dict) -> str:
     Classify the question and return a markdown-formatted answer
     drawn entirely from local model outputs. No external API calls.
     """
-    from src.models.combo_optimizer import get_combo_summary
-    from src.models.demand_forecaster import forecast_all_branches
-    from src.models.expansion_analyzer import expansion_feasibility
-    from src.models.staffing_estimator import get_staffing_recommendations
-    from src.models.sales_strategist import generate_growth_strategy
-
     topic = _classify(question)
 
     try:
-        if topic == "staffing":
-            staffing = get_staffing_recommendations(data["attendance"])
-            return _answer_staffing(staffing, question)
-
-        elif topic == "combo":
-            combo = get_combo_summary(data["delivery_items"])
-            return _answer_combo(combo, question)
-
-        elif topic == "demand":
-            demand = forecast_all_branches(data["monthly_sales"])
-            return _answer_demand(demand, question)
-
-        elif topic == "expansion":
-            expansion = expansion_feasibility(
-                data["monthly_sales"], data["branch_revenue"], data["menu_avg_sales"]
-            )
-            return _answer_expansion(expansion, question)
-
-        elif topic == "beverage":
-            strategy = generate_growth_strategy(data["sales_by_item"], data["division_summary"])
-            return _answer_strategy(strategy, question)
-
-        else:  # overview / fallback
-            combo = get_combo_summary(data["delivery_items"])
-            demand = forecast_all_branches(data["monthly_sales"])
-            expansion = expansion_feasibility(
-                data["monthly_sales"], data["branch_revenue"], data["menu_avg_sales"]
-            )
-            staffing = get_staffing_recommendations(data["attendance"])
-            strategy = generate_growth_strategy(data["sales_by_item"], data["division_summary"])
-            return _answer_overview(combo, demand, expansion, staffing, strategy, question)
-
+        return _DISPATCH.get(topic, _overview)(data, question)
     except Exception as e:
         return f"**Error generating answer:** {e}\n\nPlease ensure the API backend is running with all data files present."
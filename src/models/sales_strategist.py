@@ -4,15 +4,23 @@ Analyses sales data to identify underperforming segments and generate
 data-driven strategies to increase coffee and milkshake revenue.
 """
 from __future__ import annotations
+import re
 import pandas as pd
 import numpy as np
 
+from src.models._cache import memoize_on_frames
+
 
 COFFEE_KEYWORDS = [
     "COFFEE", "ESPRESSO", "CAPPUCCINO", "LATTE", "AMERICANO",
     "MOCHA", "FLAT WHITE", "MACCHIATO", "FRAPPE", "HOT CHOCOLATE",
 ]
 MILKSHAKE_KEYWORDS = ["MILKSHAKE", "SHAKE", "FRAPPE"]
+CHIMNEY_KEYWORDS = ["CHIMNEY", "CONUT", "DONUT"]
+
+_MILK_RE = re.compile("|".join(map(re.escape, MILKSHAKE_KEYWORDS)))
+_COFFEE_RE = re.compile("|".join(map(re.escape, COFFEE_KEYWORDS)))
+_CHIMNEY_RE = re.compile("|".join(map(re.escape, CHIMNEY_KEYWORDS)))
 
 
 def classify_item(item: str) -> str:
@@ -22,24 +30,37 @@ def classify_item(item: str) -> str:
         return "milkshake"
     if any(k in upper for k in COFFEE_KEYWORDS):
         return "coffee"
-    if "CHIMNEY" in upper or "CONUT" in upper or "DONUT" in upper:
+    if any(k in upper for k in CHIMNEY_KEYWORDS):
         return "chimney_cake"
     return "other"
 
 
 def segment_sales(sales_by_item_df: pd.DataFrame) -> pd.DataFrame:
     """Add a segment column and compute segment-level aggregates."""
-    df = sales_by_item_df.copy()
-    df["segment"] = df["item"].apply(classify_item)
-    return df
+    # Vectorised equivalent of classify_item: one regex scan per keyword group,
+    # with np.select applying the same milkshake > coffee > chimney precedence
+    upper = sales_by_item_df["item"].str.upper()
+    milk = upper.str.contains(_MILK_RE, na=False).to_numpy()
+    coffee = upper.str.contains(_COFFEE_RE, na=False).to_numpy()
+    chimney = upper.str.contains(_CHIMNEY_RE, na=False).to_numpy()
+    segment = np.select(
+        [milk, coffee, chimney],
+        ["milkshake", "coffee", "chimney_cake"],
+        default="other",
+    )
+    return sales_by_item_df.assign(segment=pd.Categorical(segment))
 
 
 def compute_segment_share(sales_by_item_df: pd.DataFrame) -> pd.DataFrame:
     """Revenue share by segment for each branch."""
-    df = segment_sales(sales_by_item_df)
-    branch_total = df.groupby("branch")["total_amount"].sum().rename("branch_total")
+    return _segment_share(segment_sales(sales_by_item_df))
+
+
+def _segment_share(df: pd.DataFrame) -> pd.DataFrame:
+    """compute_segment_share on a segment_sales() frame."""
+    branch_total = df.groupby("branch", observed=True)["total_amount"].sum().rename("branch_total")
     seg = (
-        df.groupby(["branch", "segment"])["total_amount"]
+        df.groupby(["branch", "segment"], observed=True)["total_amount"]
         .sum()
         .reset_index(name="segment_revenue")
         .join(branch_total, on="branch")
@@ -48,54 +69,59 @@ def compute_segment_share(sales_by_item_df: pd.DataFrame) -> pd.DataFrame:
     return seg
 
 
-def top_coffee_items(sales_by_item_df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
-    """Return top N coffee items by total revenue across all branches."""
-    df = segment_sales(sales_by_item_df)
-    coffee = df[df["segment"] == "coffee"]
+def _top_segment_items(df: pd.DataFrame, segment: str, top_n: int) -> pd.DataFrame:
+    """Top N items of one segment by total revenue, from a segment_sales() frame."""
     return (
-        coffee.groupby("item")
+        df[df["segment"] == segment]
+        .groupby("item")
         .agg(total_qty=("qty", "sum"), total_revenue=("total_amount", "sum"))
-        .sort_values("total_revenue", ascending=False)
-        .head(top_n)
+        .nlargest(top_n, "total_revenue")
         .reset_index()
     )
 
 
+def top_coffee_items(sales_by_item_df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
+    """Return top N coffee items by total revenue across all branches."""
+    return _top_segment_items(segment_sales(sales_by_item_df), "coffee", top_n)
+
+
 def top_milkshake_items(sales_by_item_df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
     """Return top N milkshake items by total revenue."""
-    df = segment_sales(sales_by_item_df)
-    shakes = df[df["segment"] == "milkshake"]
-    return (
-        shakes.groupby("item")
-        .agg(total_qty=("qty", "sum"), total_revenue=("total_amount", "sum"))
-        .sort_values("total_revenue", ascending=False)
-        .head(top_n)
-        .reset_index()
-    )
+    return _top_segment_items(segment_sales(sales_by_item_df), "milkshake", top_n)
 
 
 def branch_coffee_comparison(sales_by_item_df: pd.DataFrame) -> pd.DataFrame:
     """Compare coffee performance across branches (qty and revenue per branch)."""
-    df = segment_sales(sales_by_item_df)
+    return _branch_coffee_comparison(segment_sales(sales_by_item_df))
+
+
+def _branch_coffee_comparison(df: pd.DataFrame) -> pd.DataFrame:
+    """branch_coffee_comparison on a segment_sales() frame."""
     coffee = df[df["segment"].isin(["coffee", "milkshake"])]
     return (
-        coffee.groupby(["branch", "segment"])
+        coffee.groupby(["branch", "segment"], observed=True)
         .agg(total_qty=("qty", "sum"), total_revenue=("total_amount", "sum"))
         .reset_index()
     )
 
 
+@memoize_on_frames
 def generate_growth_strategy(
     sales_by_item_df: pd.DataFrame,
     division_summary_df: pd.DataFrame,
 ) -> dict:
     """
     Analyse sales data and return a comprehensive coffee & milkshake growth strategy.
+    Item, comparison and share tables are returned as DataFrames.
     """
-    share = compute_segment_share(sales_by_item_df)
-    top_coffee = top_coffee_items(sales_by_item_df, 5)
-    top_shakes = top_milkshake_items(sales_by_item_df, 5)
-    branch_compare = branch_coffee_comparison(sales_by_item_df)
+    # Classify items once and share the segmented frame across every helper;
+    # categorical branch/segment keys are hashed once, not on every groupby
+    seg_df = segment_sales(sales_by_item_df)
+    seg_df["branch"] = seg_df["branch"].astype("category")
+    share = _segment_share(seg_df)
+    top_coffee = _top_segment_items(seg_df, "coffee", 5)
+    top_shakes = _top_segment_items(seg_df, "milkshake", 5)
+    branch_compare = _branch_coffee_comparison(seg_df)
 
     # Find branches where coffee < 20% of revenue (growth opportunity)
     coffee_share = share[share["segment"] == "coffee"]
@@ -106,17 +132,10 @@ def generate_growth_strategy(
     shake_under = shake_share[shake_share["share_pct"] < 10]["branch"].tolist()
 
     # Overall metrics
-    total_coffee_rev = float(
-        sales_by_item_df[
-            sales_by_item_df["item"].apply(classify_item) == "coffee"
-        ]["total_amount"].sum()
-    )
-    total_shake_rev = float(
-        sales_by_item_df[
-            sales_by_item_df["item"].apply(classify_item) == "milkshake"
-        ]["total_amount"].sum()
-    )
-    total_rev = float(sales_by_item_df["total_amount"].sum())
+    seg_totals = seg_df.groupby("segment", observed=True)["total_amount"].sum()
+    total_coffee_rev = float(seg_totals.get("coffee", 0.0))
+    total_shake_rev = float(seg_totals.get("milkshake", 0.0))
+    total_rev = float(seg_totals.sum())
 
     strategies = []
 
@@ -180,9 +199,9 @@ def generate_growth_strategy(
         "underperforming_coffee_branches": under_performing,
         "outperforming_coffee_branches": outperforming,
         "underperforming_shake_branches": shake_under,
-        "top_coffee_items": top_coffee.to_dict(orient="records"),
-        "top_milkshake_items": top_shakes.to_dict(orient="records"),
-        "branch_comparison": branch_compare.to_dict(orient="records"),
-        "segment_share": share.to_dict(orient="records"),
+        "top_coffee_items": top_coffee,
+        "top_milkshake_items": top_shakes,
+        "branch_comparison": branch_compare,
+        "segment_share": share,
         "strategies": strategies,
     }
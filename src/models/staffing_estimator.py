@@ -4,10 +4,20 @@ Analyses time & attendance logs to derive per-shift employee requirements
 and correlates with sales demand to produce data-driven staffing recommendations.
 """
 from __future__ import annotations
+import math
 import pandas as pd
 import numpy as np
 from typing import Optional
 
+from src.models._cache import memoize_on_frames
+
+try:
+    from numba import njit  # type: ignore
+    _HAS_NUMBA = True
+except Exception:
+    njit = None
+    _HAS_NUMBA = False
+
 
 SHIFT_BINS = {
     "Morning (06–14)": (6, 14),
@@ -36,54 +46,115 @@ def assign_shift(hour: Optional[int]) -> str:
     return "Night (22–06)"
 
 
+def _punch_hours(punch_in: pd.Series) -> pd.Series:
+    """Vectorised parse_punch_hour: leading hour field as nullable Int16."""
+    s = punch_in.astype("string").str.replace(".", ":", regex=False).str.strip()
+    return pd.to_numeric(s.str.split(":", n=1).str[0], errors="coerce").astype("Int16")
+
+
+def _shifts(hours: pd.Series) -> np.ndarray:
+    """
+    Vectorised assign_shift over an hour series. Missing hours fall through to
+    'Night (22–06)', as NaN hours did when assign_shift was applied row by row.
+    """
+    h = hours.to_numpy(dtype="float64", na_value=np.nan)
+    conditions = []
+    labels = []
+    for shift, (start, end) in SHIFT_BINS.items():
+        in_shift = (h >= start) & (h < min(end, 24))
+        if end > 24:
+            in_shift |= h < end - 24
+        conditions.append(in_shift)
+        labels.append(shift)
+    return np.select(conditions, labels, default="Night (22–06)")
+
+
+def _recommend_kernel(mean: np.ndarray, mx: np.ndarray) -> np.ndarray:
+    """ceil(mean * 1.15) capped at mx, in one fused loop."""
+    out = np.empty(mean.shape[0], np.int32)
+    for i in range(mean.shape[0]):
+        v = int(math.ceil(mean[i] * 1.15))
+        out[i] = v if v < mx[i] else mx[i]
+    return out
+
+
+def _recommend_numpy(mean: np.ndarray, mx: np.ndarray) -> np.ndarray:
+    """Same result as _recommend_kernel using in-place NumPy ops (no numba)."""
+    out = mean * 1.15
+    np.ceil(out, out=out)
+    np.minimum(out, mx, out=out)
+    return out.astype(np.int32)
+
+
+_recommend = njit(cache=True)(_recommend_kernel) if _HAS_NUMBA else _recommend_numpy
+
+
+def _prepare_attendance(attendance_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filter ghost punches and derive punch_hour, shift, date_str and day_of_week
+    once. Always run on a raw attendance frame; prepared frames are only passed
+    between the private *_from_prepared helpers.
+    """
+    # Narrow slice of the columns the staffing helpers read; ghost/test punches removed
+    df = attendance_df.loc[
+        attendance_df["work_hours"] > 0.5,
+        ["branch", "employee_id", "date", "punch_in", "work_hours"],
+    ]
+    punch_hour = _punch_hours(df["punch_in"])
+    # Categorical group keys: strings are hashed once here instead of per groupby
+    return df.assign(
+        branch=df["branch"].astype("category"),
+        punch_hour=punch_hour,
+        shift=pd.Categorical(_shifts(punch_hour)),
+        date_str=df["date"].dt.date.astype(str),
+        day_of_week=df["date"].dt.day_name().astype("category"),
+    )
+
+
 def compute_shift_staffing(attendance_df: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregate attendance by branch × shift × day to get headcount per shift.
     Returns a summary DataFrame with mean/max/recommended staff.
     """
-    df = attendance_df.copy()
-    df = df[df["work_hours"] > 0.5]  # remove ghost/test punches
+    return _shift_staffing_from_prepared(_prepare_attendance(attendance_df))
 
-    df["punch_hour"] = df["punch_in"].apply(parse_punch_hour)
-    df["shift"] = df["punch_hour"].apply(assign_shift)
-    df["date_str"] = df["date"].dt.date.astype(str)
-    df["day_of_week"] = df["date"].dt.day_name()
 
-    # Count distinct employees per branch × shift × date
+def _shift_staffing_from_prepared(df: pd.DataFrame) -> pd.DataFrame:
+    """compute_shift_staffing on a frame already passed through _prepare_attendance."""
+    # Count distinct employees per branch × shift × date (dedupe + size is
+    # cheaper than nunique), then reduce the MultiIndex series directly
     daily_counts = (
-        df.groupby(["branch", "shift", "date_str", "day_of_week"])["employee_id"]
-        .nunique()
-        .reset_index(name="staff_count")
+        df.dropna(subset=["employee_id"])
+        .drop_duplicates(["branch", "shift", "date_str", "employee_id"])
+        .groupby(["branch", "shift", "date_str"], observed=True)
+        .size()
     )
 
     summary = (
-        daily_counts.groupby(["branch", "shift"])
+        daily_counts.groupby(level=["branch", "shift"], observed=True)
         .agg(
-            mean_staff=("staff_count", "mean"),
-            max_staff=("staff_count", "max"),
-            min_staff=("staff_count", "min"),
-            days_observed=("staff_count", "count"),
+            mean_staff="mean",
+            max_staff="max",
+            min_staff="min",
+            days_observed="count",
         )
         .reset_index()
     )
     # Recommended = ceil(mean * 1.15) safety buffer, capped at max
-    summary["recommended_staff"] = np.ceil(summary["mean_staff"] * 1.15).clip(
-        upper=summary["max_staff"]
-    ).astype(int)
+    summary["recommended_staff"] = _recommend(
+        summary["mean_staff"].to_numpy(np.float64),
+        summary["max_staff"].to_numpy(np.int32),
+    )
 
     return summary
 
 
 def staffing_by_day(attendance_df: pd.DataFrame) -> pd.DataFrame:
     """Day-of-week staffing patterns."""
-    df = attendance_df.copy()
-    df = df[df["work_hours"] > 0.5]
-    df["day_of_week"] = df["date"].dt.day_name()
-    df["punch_hour"] = df["punch_in"].apply(parse_punch_hour)
-    df["shift"] = df["punch_hour"].apply(assign_shift)
+    df = _prepare_attendance(attendance_df)
 
     return (
-        df.groupby(["branch", "day_of_week", "shift"])["employee_id"]
+        df.groupby(["branch", "day_of_week", "shift"], observed=True)["employee_id"]
         .nunique()
         .reset_index(name="avg_staff")
     )
@@ -91,9 +162,9 @@ def staffing_by_day(attendance_df: pd.DataFrame) -> pd.DataFrame:
 
 def compute_avg_hours_per_employee(attendance_df: pd.DataFrame) -> pd.DataFrame:
     """Return avg, min, max hours worked per branch."""
-    df = attendance_df[attendance_df["work_hours"] > 0.5].copy()
+    df = attendance_df.loc[attendance_df["work_hours"] > 0.5, ["branch", "work_hours"]]
     return (
-        df.groupby("branch")["work_hours"]
+        df.groupby("branch", observed=True)["work_hours"]
         .agg(["mean", "median", "min", "max", "count"])
         .rename(columns={"mean":"avg_hours","median":"median_hours",
                          "min":"min_hours","max":"max_hours","count":"shift_records"})
@@ -101,33 +172,39 @@ def compute_avg_hours_per_employee(attendance_df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
+@memoize_on_frames
 def get_staffing_recommendations(attendance_df: pd.DataFrame) -> dict:
-    """Main entry-point: full staffing recommendation report."""
+    """
+    Main entry-point: full staffing recommendation report.
+    shift_summary and hours_per_employee are DataFrames; serialize at the API edge.
+    """
     if attendance_df.empty:
         return {"error": "No attendance data available"}
 
-    shift_summary = compute_shift_staffing(attendance_df)
+    shift_summary = _shift_staffing_from_prepared(_prepare_attendance(attendance_df))
     hours_summary = compute_avg_hours_per_employee(attendance_df)
 
-    recommendations = []
-    for _, row in shift_summary.iterrows():
-        recommendations.append(
-            f"{row['branch']} – {row['shift']}: "
-            f"recommend {row['recommended_staff']} staff "
-            f"(observed range {int(row['min_staff'])}–{int(row['max_staff'])}, "
-            f"avg {row['mean_staff']:.1f})"
-        )
+    # Build the message columns with vectorised string concatenation
+    slot = shift_summary["branch"].astype(str) + " – " + shift_summary["shift"].astype(str)
+    min_staff = shift_summary["min_staff"].astype(int).astype(str)
+    recommendations = (
+        slot
+        + ": recommend " + shift_summary["recommended_staff"].astype(str)
+        + " staff (observed range " + min_staff
+        + "–" + shift_summary["max_staff"].astype(int).astype(str)
+        + ", avg " + np.char.mod("%.1f", shift_summary["mean_staff"].to_numpy())
+        + ")"
+    ).tolist()
 
     # Identify understaffed shifts (min < 2 staff)
-    understaffed = shift_summary[shift_summary["min_staff"] < 2]
-    alerts = [
-        f"ALERT: {row['branch']} – {row['shift']} had as few as {int(row['min_staff'])} staff on some days."
-        for _, row in understaffed.iterrows()
-    ]
+    understaffed = (shift_summary["min_staff"] < 2).to_numpy()
+    alerts = (
+        "ALERT: " + slot[understaffed] + " had as few as " + min_staff[understaffed] + " staff on some days."
+    ).tolist()
 
     return {
-        "shift_summary": shift_summary.to_dict(orient="records"),
-        "hours_per_employee": hours_summary.to_dict(orient="records"),
+        "shift_summary": shift_summary,
+        "hours_per_employee": hours_summary,
         "recommendations": recommendations,
         "alerts": alerts,
     }
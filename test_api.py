@@ -8,7 +8,40 @@ import sys
 import json
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional: orjson decodes the response bytes directly (stdlib json otherwise)
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Retry transient gateway errors; the final response is returned rather than raised
+_RETRY = Retry(
+    total=2,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "POST"]),
+    raise_on_status=False,
+)
+
+# Minimum spacing between /query calls, measured from the start of each call
+QUERY_INTERVAL = 1.0
+
+ENDPOINTS = [
+    ("health", "/health"),
+    ("combo", "/combo"),
+    ("demand", "/demand?n_months=3"),
+    ("demand_jnah", "/demand/Conut%20Jnah?n_months=3"),
+    ("expansion", "/expansion"),
+    ("staffing", "/staffing"),
+    ("strategy", "/strategy"),
+    ("overview", "/overview"),
+]
 
 def parse_args():
     p = argparse.ArgumentParser()
@@ -16,6 +49,11 @@ def parse_args():
     return p.parse_args()
 
 
+def read_json(r):
+    """Decode a response body from its raw bytes, skipping requests' text decoding."""
+    return _loads(r.content)
+
+
 def hr(title=""):
     print(f"\n{'='*60}")
     if title:
@@ -26,30 +64,42 @@ def hr(title=""):
 def check(label, r):
     if r.status_code == 200:
         print(f"  [OK] {label}")
-        return r.json()
+        return read_json(r)
     else:
         print(f"  [FAIL] {label} — HTTP {r.status_code}: {r.text[:200]}")
         return {}
 
 
+def fetch_all(s, base, endpoints):
+    """Issue the independent GETs concurrently; returns {key: Response}."""
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as ex:
+        futures = {k: ex.submit(s.get, f"{base}{path}") for k, path in endpoints}
+    return {k: f.result() for k, f in futures.items()}
+
+
 def main():
     args = parse_args()
     BASE = args.api_url.rstrip("/")
     s = requests.Session()
     s.timeout = 30
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=_RETRY)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip"})
 
     hr("Conut AI Ops Agent — OpenClaw Integration Test")
     print(f"  Target: {BASE}\n")
+    results = fetch_all(s, BASE, ENDPOINTS)
 
     # ── 1. Health ─────────────────────────────────────────────────────────────
     hr("1. Health Check")
-    r = s.get(f"{BASE}/health")
+    r = results["health"]
     data = check("GET /health", r)
     print(f"     Status: {data.get('status')} | Service: {data.get('service')}")
 
     # ── 2. Combo ──────────────────────────────────────────────────────────────
     hr("2. Combo Optimization  (GET /combo)")
-    r = s.get(f"{BASE}/combo")
+    r = results["combo"]
     data = check("GET /combo", r)
     recs = data.get("recommendations", [])
     for i, rec in enumerate(recs[:3], 1):
@@ -57,14 +107,14 @@ def main():
 
     # ── 3. Demand — all branches ──────────────────────────────────────────────
     hr("3. Demand Forecast — All Branches  (GET /demand)")
-    r = s.get(f"{BASE}/demand?n_months=3")
+    r = results["demand"]
     data = check("GET /demand", r)
     for b in data.get("demand_ranking", []):
         print(f"     {b['branch']:25s}  avg_forecast = {b['avg_forecast']:>15,.0f}")
 
     # ── 4. Demand — single branch ─────────────────────────────────────────────
     hr("4. Demand Forecast — Conut Jnah  (GET /demand/{branch})")
-    r = s.get(f"{BASE}/demand/Conut%20Jnah?n_months=3")
+    r = results["demand_jnah"]
     data = check("GET /demand/Conut Jnah", r)
     print(f"     Growth: {data.get('growth_pct_over_period', 0):+.1f}%")
     print(f"     Insight: {data.get('insight', '')}")
@@ -73,7 +123,7 @@ def main():
 
     # ── 5. Expansion ──────────────────────────────────────────────────────────
     hr("5. Expansion Feasibility  (GET /expansion)")
-    r = s.get(f"{BASE}/expansion")
+    r = results["expansion"]
     data = check("GET /expansion", r)
     print(f"     Verdict: {data.get('feasibility')}")
     stats = data.get("network_stats", {})
@@ -84,7 +134,7 @@ def main():
 
     # ── 6. Staffing ───────────────────────────────────────────────────────────
     hr("6. Shift Staffing  (GET /staffing)")
-    r = s.get(f"{BASE}/staffing")
+    r = results["staffing"]
     data = check("GET /staffing", r)
     for rec in data.get("recommendations", [])[:4]:
         print(f"     - {rec}")
@@ -96,7 +146,7 @@ def main():
 
     # ── 7. Strategy ───────────────────────────────────────────────────────────
     hr("7. Coffee & Milkshake Strategy  (GET /strategy)")
-    r = s.get(f"{BASE}/strategy")
+    r = results["strategy"]
     data = check("GET /strategy", r)
     summary = data.get("summary", {})
     print(f"     Coffee share:    {summary.get('coffee_share_pct', 0):.1f}%")
@@ -108,7 +158,7 @@ def main():
 
     # ── 8. Overview ───────────────────────────────────────────────────────────
     hr("8. Full Overview  (GET /overview)")
-    r = s.get(f"{BASE}/overview")
+    r = results["overview"]
     data = check("GET /overview", r)
     print(f"     Expansion verdict: {data.get('expansion_verdict')}")
     top_loc = data.get("expansion_top_location", {})
@@ -123,15 +173,27 @@ def main():
         "What is the best combo to promote this week?",
         "Should we open a new branch in Hamra?",
     ]
+    next_allowed = 0.0
     for q in questions:
         print(f"\n  Q: {q}")
         try:
-            r = s.post(f"{BASE}/query", json={"question": q}, timeout=60)
+            for attempt in range(2):
+                # Token-bucket pacing: slow replies have already used up the interval
+                wait = next_allowed - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+                next_allowed = time.time() + QUERY_INTERVAL
+                # Only 300 chars are printed, so ask the server for a short answer
+                r = s.post(f"{BASE}/query", json={"question": q, "max_answer_chars": 320}, timeout=60)
+                if r.status_code != 429 or attempt:
+                    break
+                # Rate limited: back off for a double interval and retry the question once
+                next_allowed = time.time() + 2 * QUERY_INTERVAL
             if r.status_code == 503:
                 print("     [SKIP] GEMINI_API_KEY not set — set env var to enable AI responses")
                 break
             elif r.status_code == 200:
-                answer = r.json().get("answer", "")
+                answer = read_json(r).get("answer", "")
                 # Print first 300 chars
                 short = answer[:300].replace("\n", " ")
                 print(f"  A: {short}{'...' if len(answer) > 300 else ''}")
@@ -139,7 +201,6 @@ def main():
                 print(f"     [FAIL] HTTP {r.status_code}")
         except requests.exceptions.Timeout:
             print("     [TIMEOUT] Gemini took too long")
-        time.sleep(1)
 
     hr("ALL TESTS COMPLETE")
     print("  Screenshot or record this output for your demo evidence.\n")
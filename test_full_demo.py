@@ -2,43 +2,135 @@
 Full demo test — starts the API server, runs all endpoint tests, then stops it.
 Simulates exactly what OpenClaw does when invoking the Conut Ops Agent.
 
-Usage: python test_full_demo.py [--gemini-key YOUR_KEY]
+Usage: python test_full_demo.py [--gemini-key YOUR_KEY] [--minimal | --full]
+
+/overview is fetched once and feeds the overview, combo, demand-ranking,
+expansion-verdict and strategy-summary sections:
+  overview.combo_highlights                       -> section 3
+  overview.demand_ranking                         -> section 4
+  overview.expansion_verdict / top_location       -> section 6 header
+  overview.coffee_share_pct / milkshake_share_pct -> section 8 summary
+  overview.growth_strategies                      -> section 8 titles
+Granular endpoints are only called for what overview does not expose.
 """
 import sys
 import os
+import asyncio
 import json
 import time
 import signal
 import argparse
 import subprocess
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 
+# Optional: orjson decodes the response bytes directly (stdlib json otherwise)
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Optional: async fan-out with httpx (falls back to a thread pool)
+try:
+    import httpx
+    _HAS_HTTPX = True
+except ImportError:
+    httpx = None
+    _HAS_HTTPX = False
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2, negotiated over https:// only)
+    _HAS_H2 = True
+except ImportError:
+    _HAS_H2 = False
+
 ROOT = Path(__file__).parent
 BASE_URL = "http://localhost:8000"
 
+# Retry transient gateway errors (e.g. cold-start 503s); the final response is
+# returned rather than raised
+_RETRY = Retry(
+    total=2,
+    connect=0,  # refused connections are polled by the caller, not retried here
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "POST"]),
+    raise_on_status=False,
+)
+
+# One pooled session for the startup probe and the tests, so the first real
+# request reuses the keep-alive connection opened by wait_for_api
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=_RETRY)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+SESSION.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip"})
+
+# Minimum spacing between /query calls, measured from the start of each call
+QUERY_INTERVAL = 2.0
+
+# Requests per run mode; everything else is read from /overview
+ENDPOINTS = {
+    "minimal": [
+        ("overview", "/overview"),
+        ("staffing", "/staffing"),
+        ("demand_jnah", "/demand/Conut%20Jnah"),
+    ],
+}
+ENDPOINTS["default"] = [("health", "/health")] + ENDPOINTS["minimal"] + [("strategy", "/strategy")]
+ENDPOINTS["full"] = ENDPOINTS["default"] + [("expansion", "/expansion")]
+
 
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--gemini-key", default=os.getenv("GEMINI_API_KEY", ""))
     p.add_argument("--port", type=int, default=8000)
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--minimal", dest="mode", action="store_const", const="minimal",
+                      help="only /overview, /staffing and /demand/{branch}")
+    mode.add_argument("--full", dest="mode", action="store_const", const="full",
+                      help="also fetch /expansion for signals and all candidate locations")
+    p.set_defaults(mode="default")
     return p.parse_args()
 
 
-def wait_for_api(url: str, timeout: int = 20) -> bool:
-    """Poll until the API responds or we time out."""
-    deadline = time.time() + timeout
+def wait_for_api(url: str, session: requests.Session, timeout: int = 20) -> bool:
+    """Poll until the API responds or we time out (every 0.1s for the first second, then 0.5s)."""
+    start = time.time()
+    deadline = start + timeout
     while time.time() < deadline:
         try:
-            r = requests.get(url, timeout=2)
+            r = session.get(url, timeout=1)
             if r.status_code == 200:
                 return True
         except Exception:
             pass
-        time.sleep(0.5)
+        time.sleep(0.1 if (time.time() - start) < 1.0 else 0.5)
     return False
 
 
+def stop_api(proc: subprocess.Popen) -> None:
+    """Stop uvicorn via SIGINT (graceful shutdown) where supported, killing it if it hangs."""
+    if os.name == "nt":
+        proc.terminate()  # Windows cannot deliver SIGINT to a child process
+    else:
+        proc.send_signal(signal.SIGINT)
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def read_json(r):
+    """Decode a response body from its raw bytes, skipping requests' text decoding."""
+    return _loads(r.content)
+
+
 def hr(title=""):
     print(f"\n{'='*65}")
     if title:
@@ -55,58 +147,81 @@ def fail(label, reason=""):
     print(f"  [FAIL] {label}  {reason}")
 
 
-def run_tests(base: str, gemini_key: str):
-    s = requests.Session()
-    s.timeout = 30
+async def _get_retrying(c, path):
+    """GET with the same status retries and backoff as the SESSION adapter."""
+    for attempt in range(_RETRY.total + 1):
+        r = await c.get(path)
+        if r.status_code not in _RETRY.status_forcelist or attempt == _RETRY.total:
+            return r
+        await asyncio.sleep(_RETRY.backoff_factor * 2 ** attempt)
+
+
+async def _fetch_all_async(s, base, endpoints):
+    """Fan the GETs out with asyncio, one connection per request.
+
+    uvicorn speaks HTTP/1.1 and httpx never negotiates h2 over cleartext, so
+    HTTP/2 multiplexing is only enabled for https:// bases.
+    """
+    n = len(endpoints)
+    async with httpx.AsyncClient(
+        base_url=base, http2=_HAS_H2 and base.startswith("https://"),
+        headers=dict(s.headers), timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=n, max_connections=n),
+    ) as c:
+        responses = await asyncio.gather(*(_get_retrying(c, path) for _, path in endpoints))
+    return {k: r for (k, _), r in zip(endpoints, responses)}
+
+
+def fetch_all(s, base, endpoints):
+    """Issue the independent GETs concurrently; returns {key: Response}."""
+    if _HAS_HTTPX:
+        return asyncio.run(_fetch_all_async(s, base, endpoints))
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as ex:
+        futures = {k: ex.submit(s.get, f"{base}{path}") for k, path in endpoints}
+    return {k: f.result() for k, f in futures.items()}
+
+
+def run_tests(base: str, gemini_key: str, s: requests.Session = SESSION, mode: str = "default"):
+    results = fetch_all(s, base, ENDPOINTS[mode])
 
     # ── Health ────────────────────────────────────────────────────────────────
-    hr("1. Health Check")
-    r = s.get(f"{base}/health")
-    d = ok("GET /health", r.json()) if r.ok else fail("GET /health", r.text)
-    print(f"     {d}")
+    if "health" in results:
+        hr("1. Health Check")
+        r = results["health"]
+        d = ok("GET /health", read_json(r)) if r.status_code < 400 else fail("GET /health", r.text)
+        print(f"     {d}")
 
     # ── Overview ──────────────────────────────────────────────────────────────
     hr("2. Overview (all 5 objectives in one call)")
-    r = s.get(f"{base}/overview")
-    if r.ok:
-        d = r.json()
+    r = results["overview"]
+    if r.status_code < 400:
+        overview = read_json(r)
         ok("GET /overview")
-        print(f"     Expansion verdict  : {d.get('expansion_verdict')}")
-        print(f"     Coffee share       : {d.get('coffee_share_pct', 0):.1f}%")
-        print(f"     Milkshake share    : {d.get('milkshake_share_pct', 0):.1f}%")
-        top = d.get("expansion_top_location", {})
+        print(f"     Expansion verdict  : {overview.get('expansion_verdict')}")
+        print(f"     Coffee share       : {overview.get('coffee_share_pct', 0):.1f}%")
+        print(f"     Milkshake share    : {overview.get('milkshake_share_pct', 0):.1f}%")
+        top = overview.get("expansion_top_location", {})
         print(f"     Top location       : {top.get('location')} (score {top.get('composite_score')})")
-        print("     Active strategies  :", d.get("growth_strategies", [])[:2])
+        print("     Active strategies  :", overview.get("growth_strategies", [])[:2])
     else:
+        overview = {}
         fail("GET /overview", r.text)
 
     # ── Combo ─────────────────────────────────────────────────────────────────
     hr("3. Combo Optimization")
-    r = s.get(f"{base}/combo")
-    if r.ok:
-        d = r.json()
-        ok("GET /combo")
-        for i, rec in enumerate(d.get("recommendations", [])[:3], 1):
-            print(f"     {i}. {rec}")
-    else:
-        fail("GET /combo", r.text)
+    for i, rec in enumerate(overview.get("combo_highlights", [])[:3], 1):
+        print(f"     {i}. {rec}")
 
     # ── Demand all ────────────────────────────────────────────────────────────
     hr("4. Demand Forecast — All Branches")
-    r = s.get(f"{base}/demand?n_months=3")
-    if r.ok:
-        d = r.json()
-        ok("GET /demand")
-        for b in d.get("demand_ranking", []):
-            print(f"     {b['branch']:25s}  {b['avg_forecast']:>15,.0f}")
-    else:
-        fail("GET /demand", r.text)
+    for b in overview.get("demand_ranking", []):
+        print(f"     {b['branch']:25s}  {b['avg_forecast']:>15,.0f}")
 
     # ── Demand single ─────────────────────────────────────────────────────────
     hr("5. Demand Forecast — Conut Jnah only")
-    r = s.get(f"{base}/demand/Conut%20Jnah")
-    if r.ok:
-        d = r.json()
+    r = results["demand_jnah"]
+    if r.status_code < 400:
+        d = read_json(r)
         ok("GET /demand/Conut Jnah")
         print(f"     Growth: {d.get('growth_pct_over_period', 0):+.1f}%")
         print(f"     Insight: {d.get('insight', '')[:100]}")
@@ -117,25 +232,30 @@ def run_tests(base: str, gemini_key: str):
 
     # ── Expansion ─────────────────────────────────────────────────────────────
     hr("6. Expansion Feasibility")
-    r = s.get(f"{base}/expansion")
-    if r.ok:
-        d = r.json()
-        ok("GET /expansion")
-        print(f"     Verdict: {d.get('feasibility')}")
-        signals = d.get("signals", {})
-        for k, v in signals.items():
-            print(f"       {'YES' if v else 'NO ':4s}  {k}")
-        print("     Top candidate locations:")
-        for loc in d.get("top_candidate_locations", [])[:3]:
-            print(f"       {loc['location']:20s}  composite={loc['composite_score']:.1f}")
+    print(f"     Verdict: {overview.get('expansion_verdict')}")
+    if "expansion" in results:
+        r = results["expansion"]
+        if r.status_code < 400:
+            d = read_json(r)
+            ok("GET /expansion")
+            signals = d.get("signals", {})
+            for k, v in signals.items():
+                print(f"       {'YES' if v else 'NO ':4s}  {k}")
+            print("     Top candidate locations:")
+            for loc in d.get("top_candidate_locations", [])[:3]:
+                print(f"       {loc['location']:20s}  composite={loc['composite_score']:.1f}")
+        else:
+            fail("GET /expansion", r.text)
     else:
-        fail("GET /expansion", r.text)
+        loc = overview.get("expansion_top_location", {})
+        if loc:
+            print(f"     Top candidate location: {loc.get('location')}  composite={loc.get('composite_score', 0):.1f}")
 
     # ── Staffing ──────────────────────────────────────────────────────────────
     hr("7. Shift Staffing")
-    r = s.get(f"{base}/staffing")
-    if r.ok:
-        d = r.json()
+    r = results["staffing"]
+    if r.status_code < 400:
+        d = read_json(r)
         ok("GET /staffing")
         for rec in d.get("recommendations", [])[:5]:
             print(f"     - {rec}")
@@ -146,20 +266,23 @@ def run_tests(base: str, gemini_key: str):
 
     # ── Strategy ──────────────────────────────────────────────────────────────
     hr("8. Coffee & Milkshake Growth Strategy")
-    r = s.get(f"{base}/strategy")
-    if r.ok:
-        d = r.json()
-        ok("GET /strategy")
-        summary = d.get("summary", {})
-        print(f"     Coffee share    : {summary.get('coffee_share_pct', 0):.1f}%")
-        print(f"     Milkshake share : {summary.get('milkshake_share_pct', 0):.1f}%")
-        for strat in d.get("strategies", []):
-            print(f"\n     [{strat['strategy']}]")
-            print(f"       Target : {strat['target']}")
-            print(f"       Action : {strat['action'][:90]}...")
-            print(f"       Impact : {strat['expected_impact']}")
+    print(f"     Coffee share    : {overview.get('coffee_share_pct', 0):.1f}%")
+    print(f"     Milkshake share : {overview.get('milkshake_share_pct', 0):.1f}%")
+    if "strategy" in results:
+        r = results["strategy"]
+        if r.status_code < 400:
+            d = read_json(r)
+            ok("GET /strategy")
+            for strat in d.get("strategies", []):
+                print(f"\n     [{strat['strategy']}]")
+                print(f"       Target : {strat['target']}")
+                print(f"       Action : {strat['action'][:90]}...")
+                print(f"       Impact : {strat['expected_impact']}")
+        else:
+            fail("GET /strategy", r.text)
     else:
-        fail("GET /strategy", r.text)
+        for title in overview.get("growth_strategies", []):
+            print(f"     [{title}]")
 
     # ── AI Agent (Gemini) ─────────────────────────────────────────────────────
     hr("9. AI Agent — Natural Language Queries  (simulates OpenClaw messages)")
@@ -171,32 +294,35 @@ def run_tests(base: str, gemini_key: str):
             "What combo should we promote to boost basket size?",
             "Should we open a new branch in Hamra?",
         ]
+        next_allowed = 0.0
         for q in questions:
             print(f"\n  OpenClaw user: {q}")
             try:
-                r = s.post(
-                    f"{base}/query",
-                    json={"question": q, "include_data_context": True},
-                    timeout=60,
-                )
+                for attempt in range(2):
+                    # Token-bucket pacing: slow replies have already used up the interval
+                    wait = next_allowed - time.time()
+                    if wait > 0:
+                        time.sleep(wait)
+                    next_allowed = time.time() + QUERY_INTERVAL
+                    # At most 6 wrapped lines (~500 chars) are shown, so cap the answer
+                    r = s.post(
+                        f"{base}/query",
+                        json={"question": q, "include_data_context": True, "max_answer_chars": 512},
+                        timeout=60,
+                    )
+                    if r.status_code != 429 or attempt:
+                        break
+                    # Rate limited: back off for a double interval and retry the question once
+                    next_allowed = time.time() + 2 * QUERY_INTERVAL
                 if r.ok:
-                    answer = r.json().get("answer", "")
-                    # Wrap long lines
-                    words = answer.split()
-                    line, lines = [], []
-                    for w in words:
-                        line.append(w)
-                        if len(" ".join(line)) > 70:
-                            lines.append("  Agent: " + " ".join(line))
-                            line = []
-                    if line:
-                        lines.append("  Agent: " + " ".join(line))
+                    answer = read_json(r).get("answer", "")
+                    # Wrap long lines (whitespace collapsed first, as str.split did)
+                    lines = ["  Agent: " + ln for ln in textwrap.wrap(" ".join(answer.split()), width=70)]
                     print("\n".join(lines[:6]))
                 else:
                     print(f"     [FAIL] HTTP {r.status_code}")
             except Exception as e:
                 print(f"     [ERROR] {e}")
-            time.sleep(2)
 
 
 def main():
@@ -212,7 +338,9 @@ def main():
     if args.gemini_key:
         env["GEMINI_API_KEY"] = args.gemini_key
 
-    # Start uvicorn
+    # Start uvicorn with a single worker: analysis caches and /admin/refresh are
+    # per process, so one warm-up covers every request and all reads see the
+    # same data. Sync endpoints still run concurrently on its thread pool.
     proc = subprocess.Popen(
         [sys.executable, "-m", "uvicorn", "src.api.main:app",
          "--host", "0.0.0.0", "--port", str(args.port), "--log-level", "warning"],
@@ -223,20 +351,25 @@ def main():
     )
 
     print(f"  API PID: {proc.pid} — waiting for startup...")
-    ready = wait_for_api(f"{base}/health", timeout=20)
+    ready = wait_for_api(f"{base}/health", SESSION, timeout=20)
 
     if not ready:
         print("  [ERROR] API did not start in time. Check port not already in use.")
-        proc.terminate()
+        stop_api(proc)
         sys.exit(1)
 
     print("  API is UP!\n")
 
+    # Warm-up: run the heaviest aggregation once so the tests hit cached analyses
     try:
-        run_tests(base, args.gemini_key)
+        SESSION.get(f"{base}/overview", timeout=30)
+    except requests.RequestException:
+        pass
+
+    try:
+        run_tests(base, args.gemini_key, SESSION, args.mode)
     finally:
-        proc.terminate()
-        proc.wait()
+        stop_api(proc)
         print("\n  API server stopped.")
 
     hr("DEMO COMPLETE")